@@ -0,0 +1,427 @@
+"""
+Benchmarks for the JDDMenu system.
+
+Run this script from the JDDMenu directory to print timings for the menu's hot paths, including a
+comparison of render, dispatch, builder and memory costs across JDDMenu_v2_0 to JDDMenu_v2_5:
+
+    python JDDMenu_benchmarks.py
+
+Output is written to a line-buffered handle on os.devnull, which behaves like an interactive
+terminal (one write per line) without flooding the console.
+"""
+
+import builtins
+import contextlib
+import importlib
+import itertools
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import JDDMenu_v1
+from JDDMenu_v2_5 import JDDMenu, JDDMenuOutput, JDDMenuSearchIndex, MenuOption
+
+
+def noop_action(context=None):
+    pass
+
+
+def make_options(count):
+    """
+    Builds a synthetic list of menu options.
+
+    Parameters:
+    count (int): The number of options to generate.
+
+    Returns:
+    list of tuples: (option_text, action) pairs suitable for JDDMenu.
+    """
+    return [(f"Run synthetic task {index}", noop_action) for index in range(count)]
+
+
+def legacy_redraw(menu, stream):
+    """
+    Redraws the menu the way display_menu did before frames were cached: one print per line.
+    """
+    print(menu.title, file=stream)
+    print('-' * len(menu.title), file=stream)
+    for index, (option_text, _) in enumerate(menu.menu_options, start=1):
+        print(f"Enter {index} to {option_text}", file=stream)
+    print(f"Enter 0 to {menu.exit_option_text}", file=stream)
+    stream.write(menu.prompt)
+    stream.flush()
+
+
+def cached_redraw(menu, stream):
+    """
+    Redraws the menu with the cached frame: one write per redraw.
+    """
+    stream.write(menu.render_frame())
+    stream.flush()
+
+
+def time_per_call(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def best_time(func, repeat):
+    """
+    Returns the fastest of repeat timed calls, which is the least disturbed by the rest of the system.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def bench_render(option_counts=(10, 100, 1000, 10000), repeat=50):
+    """
+    Measures redraw latency against option count for the legacy and cached renderers.
+
+    Parameters:
+    option_counts (iterable of int): Menu sizes to measure.
+    repeat (int): Redraws per measurement.
+    """
+    print("Redraw latency (ms per frame)")
+    print(f"{'options':>10} {'per-line':>12} {'cached':>12} {'speedup':>10}")
+    with open(os.devnull, 'w', buffering=1) as stream:
+        for count in option_counts:
+            menu = JDDMenu(make_options(count))
+            legacy = time_per_call(lambda: legacy_redraw(menu, stream), repeat)
+            cached = time_per_call(lambda: cached_redraw(menu, stream), repeat)
+            print(f"{count:>10} {legacy * 1000:>12.3f} {cached * 1000:>12.3f} {legacy / cached:>9.1f}x")
+
+
+def bench_batch(selection_count=10000, option_count=100):
+    """
+    Compares scripted selections driven through display_menu (rendering every frame) with run_batch.
+
+    Parameters:
+    selection_count (int): The number of scripted selections.
+    option_count (int): The size of the menu.
+    """
+    script = [str(index % option_count + 1) for index in range(selection_count)]
+    print(f"Scripted selections ({selection_count} selections, {option_count} options)")
+    with open(os.devnull, 'w', buffering=1) as stream:
+        menu = JDDMenu(make_options(option_count), output=JDDMenuOutput(stream), input_source=script)
+        start = time.perf_counter()
+        menu.display_menu()
+        rendered = time.perf_counter() - start
+
+        menu = JDDMenu(make_options(option_count), output=JDDMenuOutput(stream))
+        stats = menu.run_batch(source=script)
+    print(f"{'display_menu':>14} {selection_count / rendered:>12.0f} selections/s")
+    print(f"{'run_batch':>14} {stats['throughput']:>12.0f} selections/s")
+
+
+def bench_search(option_count=100000, queries=("run", "run synth", "task 4242", "99999", "hetic tas")):
+    """
+    Measures index build time and search latency for a large menu.
+
+    Parameters:
+    option_count (int): The size of the menu.
+    queries (iterable of str): The queries to time.
+    """
+    texts = [option_text for option_text, _ in make_options(option_count)]
+    start = time.perf_counter()
+    index = JDDMenuSearchIndex(texts)
+    index.search("warm up")
+    print(f"Search index over {option_count} options built in {time.perf_counter() - start:.2f}s")
+    for query in queries:
+        latency = time_per_call(lambda: index.search(query), 100)
+        print(f"{query!r:>14} {latency * 1000:>8.3f} ms")
+
+
+def traced_bytes(build):
+    """
+    Returns the memory still allocated by what build() returns, and the result.
+    """
+    tracemalloc.start()
+    try:
+        result = build()
+        return tracemalloc.get_traced_memory()[0], result
+    finally:
+        tracemalloc.stop()
+
+
+def bench_option_memory(option_count=1000000, distinct_labels=1000):
+    """
+    Compares the memory of a large catalog stored as (text, action) tuples with ids and flags in side
+    tables keyed by position, against MenuOption records holding all four.
+
+    Labels are created per option, as they would be when read from a database or a file, and repeat
+    every distinct_labels options.
+
+    Parameters:
+    option_count (int): The size of the catalog.
+    distinct_labels (int): The number of different option texts.
+    """
+    def tuples_with_side_tables():
+        options = []
+        ids = {}
+        flags = {}
+        for index in range(option_count):
+            options.append((f"Open record {index % distinct_labels}", noop_action))
+            ids[index] = index
+            flags[index] = index & 1
+        return options, ids, flags
+
+    def menu_options():
+        return [MenuOption(f"Open record {index % distinct_labels}", noop_action, index, index & 1)
+                for index in range(option_count)]
+
+    print(f"Option storage ({option_count} options, {distinct_labels} distinct labels)")
+    for label, build in (("tuples + side tables", tuples_with_side_tables), ("MenuOption", menu_options)):
+        size, result = traced_bytes(build)
+        del result
+        print(f"{label:>22} {size / option_count:>8.1f} B/option {size / 2 ** 20:>8.1f} MiB")
+
+
+# Standard library modules that are comparatively slow to import, standing in for pandas, SDK clients, etc.
+HEAVY_ACTIONS = (
+    "http.server:test",
+    "unittest:main",
+    "xml.dom.minidom:parseString",
+    "email.mime.multipart:MIMEMultipart",
+    "sqlite3:connect",
+    "decimal:Decimal",
+    "pydoc:help",
+    "argparse:ArgumentParser",
+    "logging.handlers:RotatingFileHandler",
+    "urllib.request:urlopen",
+)
+
+STARTUP_SCRIPT = """
+import time
+start = time.perf_counter()
+from JDDMenu_v2_5 import JDDMenuBuilder, JDDMenuLoader
+builder = JDDMenuBuilder()
+for reference in {references!r}:
+    builder.add_option(reference, {action})
+builder.build().render_frame()
+print(time.perf_counter() - start)
+"""
+
+
+def bench_startup(runs=5):
+    """
+    Measures the time from a fresh interpreter to the first rendered frame for a launcher whose
+    options live in heavy modules, imported eagerly versus referenced lazily as 'module:function'.
+
+    Parameters:
+    runs (int): Fresh interpreters started per variant; the fastest run is reported.
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    print(f"Startup to first frame ({len(HEAVY_ACTIONS)} options in heavy modules, best of {runs})")
+    for label, action in (("eager import", "JDDMenuLoader.resolve(reference)"), ("lazy reference", "reference")):
+        script = STARTUP_SCRIPT.format(references=HEAVY_ACTIONS, action=action)
+        timings = [float(subprocess.run([sys.executable, "-c", script], cwd=here, check=True,
+                                        capture_output=True, text=True).stdout)
+                   for _ in range(runs)]
+        print(f"{label:>16} {min(timings) * 1000:>8.1f} ms")
+
+
+def stack_depth():
+    frame = sys._getframe(1)
+    depth = 0
+    while frame is not None:
+        depth += 1
+        frame = frame.f_back
+    return depth
+
+
+def soak_v1(round_trips=100000, sample_every=1000):
+    """
+    Soak test for the v1 menu engine: drives a long session of menu -> option -> continue -> menu round
+    trips (with invalid answers mixed in) and checks that stack depth and memory stay flat.
+
+    Before the engine was introduced every round trip added two stack frames, so this session would
+    have hit RecursionError after roughly 500 round trips.
+
+    Parameters:
+    round_trips (int): The number of times the user goes back to the main menu.
+    sample_every (int): How often (in inputs read) to sample stack depth and memory.
+    """
+    script = itertools.chain(itertools.islice(itertools.cycle(['n', 'y', 'bad', 'n', 'maybe', 'y']),
+                                              round_trips * 3), ['0'])
+    depths = []
+    memory = []
+    counter = itertools.count()
+
+    def scripted_input(prompt):
+        if next(counter) % sample_every == 0:
+            depths.append(stack_depth())
+            memory.append(tracemalloc.get_traced_memory()[0])
+        return next(script)
+
+    JDDMenu_v1.jdd_menu.input_function = scripted_input
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            JDDMenu_v1.jdd_menu.menu()
+        elapsed = time.perf_counter() - start
+    finally:
+        tracemalloc.stop()
+        JDDMenu_v1.jdd_menu.input_function = input
+
+    print(f"v1 soak: {round_trips} round trips in {elapsed:.2f}s")
+    print(f"  stack depth: min {min(depths)}, max {max(depths)}")
+    print(f"  traced memory: first sample {memory[0] / 1024:.1f} KiB, last sample {memory[-1] / 1024:.1f} KiB")
+    if max(depths) != min(depths):
+        raise AssertionError("Stack depth grew during the v1 soak")
+    # Allow for the samples collected by the soak itself
+    if memory[-1] - memory[0] > 64 * 1024:
+        raise AssertionError("Memory grew during the v1 soak")
+
+
+MENU_VERSIONS = ("JDDMenu_v2_0", "JDDMenu_v2_1", "JDDMenu_v2_2", "JDDMenu_v2_3", "JDDMenu_v2_4", "JDDMenu_v2_5")
+
+
+class ScriptedInput:
+    """
+    Stands in for the built-in input() while benchmarking menu versions that have no input abstraction.
+    """
+
+    def __init__(self):
+        self.script = iter(())
+
+    def feed(self, script):
+        self.script = iter(script)
+
+    def __call__(self, prompt=""):
+        return next(self.script)
+
+
+class NullStream:
+    """
+    A stdout replacement that discards everything, so timings leave out the cost of writing frames.
+    """
+
+    def write(self, text):
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def build_versioned_menu(module, options):
+    """
+    Builds a menu the way each version expects: v2_0 has no builder, later versions are built with
+    JDDMenuBuilder, and v2_5 asks for a yes/no after each action like the older versions always do.
+    """
+    if not hasattr(module, "JDDMenuBuilder"):
+        return module.JDDMenu(list(options))
+    builder = module.JDDMenuBuilder()
+    for option_text, action in options:
+        builder.add_option(option_text, action)
+    menu = builder.build()
+    if hasattr(menu, "cont"):
+        menu.cont = True
+    return menu
+
+
+def bench_versions(option_counts=(10, 100, 1000, 10000, 100000), selections=200, versions=MENU_VERSIONS):
+    """
+    Compares JDDMenu versions on synthetic menus, driving display_menu headlessly with scripted input.
+
+    builtins.input is replaced with a scripted source and stdout is redirected to a line-buffered handle
+    on os.devnull, because versions before v2_5 call input() and print() directly.
+
+    For each version and menu size it reports:
+        - render: one frame drawn by display_menu (menu shown, then exited with '0'), once the first
+          frame has been drawn, so versions that cache the frame are measured at steady state;
+        - dispatch: the cost of a selection (parsing, running a no-op action, the continue prompt and
+          getting back to the prompt) timed on its own, with stdout discarded so the frame writes
+          are left out. Versions that don't cache the frame still pay for formatting it here;
+        - build: constructing the menu (with JDDMenuBuilder where the version has one);
+        - memory: bytes allocated per option by the built menu, option texts excluded.
+
+    Timings are the best of several runs.
+
+    Parameters:
+    option_counts (iterable of int): Menu sizes to measure.
+    selections (int): Scripted selections per dispatch measurement (fewer for large menus).
+    versions (iterable of str): The modules to compare.
+    """
+    modules = [importlib.import_module(name) for name in versions]
+    results = {}
+    null = NullStream()
+    scripted_input = ScriptedInput()
+    original_input = builtins.input
+    builtins.input = scripted_input
+    try:
+        with open(os.devnull, 'w', buffering=1) as devnull, contextlib.redirect_stdout(devnull):
+            for count in option_counts:
+                options = make_options(count)
+                repeat = max(3, min(20, 20000 // count))
+                selection_count = max(3, min(selections, 100000 // count))
+                script = []
+                for index in range(selection_count):
+                    script += [str(index * 7919 % count + 1), 'y']
+                script.append('0')
+
+                for module in modules:
+                    start = time.perf_counter()
+                    menu = build_versioned_menu(module, options)
+                    build = time.perf_counter() - start
+
+                    tracemalloc.start()
+                    kept = build_versioned_menu(module, options)
+                    memory = tracemalloc.get_traced_memory()[0] / count
+                    tracemalloc.stop()
+                    del kept
+
+                    def show_once():
+                        scripted_input.feed(['0'])
+                        menu.display_menu()
+
+                    show_once()
+                    render = best_time(show_once, repeat)
+
+                    def session():
+                        scripted_input.feed(script)
+                        with contextlib.redirect_stdout(null):
+                            menu.display_menu()
+
+                    dispatch = best_time(session, 3) / selection_count
+
+                    results[module.__name__, count] = (render, dispatch, build, memory)
+    finally:
+        builtins.input = original_input
+
+    for label, column, scale, unit in (("Frame render", 0, 1e6, "us"), ("Dispatch", 1, 1e6, "us"),
+                                       ("Builder construction", 2, 1e6, "us"), ("Memory per option", 3, 1, "B")):
+        print(f"{label} ({unit})")
+        print(f"{'version':>14}" + "".join(f"{count:>12}" for count in option_counts))
+        for name in versions:
+            print(f"{name:>14}" + "".join(f"{results[name, count][column] * scale:>12.1f}"
+                                          for count in option_counts))
+        print()
+
+
+def main():
+    bench_versions()
+    print()
+    bench_render()
+    print()
+    bench_batch()
+    print()
+    bench_search()
+    print()
+    bench_option_memory()
+    print()
+    bench_startup()
+    print()
+    soak_v1()
+
+
+if __name__ == '__main__':
+    main()
@@ -5,10 +5,85 @@ class jdd_menu():
         It is designed for ease of use and flexibility, allowing the user to define menu options 
         and corresponding actions. The class can be easily adapted for various projects 
         by modifying the menu options and associated functionality.
+
+        The menu runs on a small state machine: `menu()` and `continue_choice()` don't call each other
+        any more, they tell the engine which screen to show next. This keeps the stack at a constant
+        depth however long the session lasts, so existing menus that call `jdd_menu.menu()` or
+        `jdd_menu.continue_choice()` from their options keep working without ever hitting RecursionError.
     """
 
+    # The screens the engine can show
+    MENU = 'menu'
+    CONTINUE = 'continue'
+    QUIT = 'quit'
+
+    # Function used to read the user's input, can be swapped out to script the menu
+    input_function = input
+
+    # Set while the engine is running, along with the next screen to show
+    _running = False
+    _next_state = None
+
 
     def menu():
+        """
+            Shows the main menu.
+
+            When called from inside a menu option this only schedules the main menu as the next screen,
+            otherwise it starts the engine on the main menu.
+
+            Returns:
+            None
+        """
+        jdd_menu.run(jdd_menu.MENU)
+
+
+    def continue_choice():
+        """
+            Offers the user a choice to continue using the application or exit.
+
+            When called from inside a menu option this only schedules the question as the next screen,
+            otherwise it starts the engine on the question.
+
+            Returns:
+            None
+        """
+        jdd_menu.run(jdd_menu.CONTINUE)
+
+
+    def run(state):
+        """
+            Runs the menu engine starting from the given screen.
+
+            Each screen returns the name of the next one (or schedules it by calling `menu()` or
+            `continue_choice()`), and the loop keeps going until a screen returns QUIT.
+
+            Returns:
+            None
+        """
+
+        # Already running, so just remember where to go once the current screen is done
+        if jdd_menu._running:
+            jdd_menu._next_state = state
+            return
+
+        screens = {
+            jdd_menu.MENU: jdd_menu.show_menu,
+            jdd_menu.CONTINUE: jdd_menu.show_continue_choice,
+        }
+
+        jdd_menu._running = True
+        try:
+            while state != jdd_menu.QUIT:
+                jdd_menu._next_state = None
+                returned = screens[state]()
+                state = returned or jdd_menu._next_state or jdd_menu.MENU
+        finally:
+            jdd_menu._running = False
+            jdd_menu._next_state = None
+
+
+    def show_menu():
         """
             Displays a menu to the user and handles their input.
 
@@ -22,7 +97,7 @@ class jdd_menu():
             - Modify or add `elif` statements to handle new options.
 
             Returns:
-            None
+            str: The next screen to show.
         """
 
         # Give the user information on what he would like to do and how to select it. 
@@ -32,55 +107,55 @@ class jdd_menu():
         print("Enter 0 to Quit")
 
         # Initial choice to see what user wants to do
-        choice = str(input("Select an option to proceed: "))
+        choice = str(jdd_menu.input_function("Select an option to proceed: "))
 
         # This is the first if, so that subsequent copy and paste can all be elif for ease of use,can be used to bugtest continue function
         if choice == 'test':
-            jdd_menu.continue_choice()
+            return jdd_menu.CONTINUE
         
         #TODO Copy and paste this for however many choices you need  
         elif choice == 'n':
             # Enter the function that you would like to be the n'th option in the menu here
-            jdd_menu.continue_choice()
+            return jdd_menu.CONTINUE
 
         elif choice == '0':
             print('Thanks for using my Script!')
-            exit()
+            return jdd_menu.QUIT
 
         # Used to let user try again if input is not a valid choice
         else:
             print("Invalid Input, please try again")
-            jdd_menu.menu()
+            return jdd_menu.MENU
 
 
-    def continue_choice():     
+    def show_continue_choice():     
         """
-            Offers the user a choice to continue using the application or exit.
+            Asks the user whether to return to the main menu or quit.
 
             This method is typically called after executing an action from the menu.
             It prompts the user to either return to the main menu for further actions
             or to quit the application.
 
             Returns:
-            None
+            str: The next screen to show.
         """ 
 
         # Prompts user to decide to either continue using script or finish.
-        cont = input('Would you like to Return to Main Menu? (y/n):')
+        cont = jdd_menu.input_function('Would you like to Return to Main Menu? (y/n):')
         
-        # Runs the menu function to return user to main menu
+        # Returns user to main menu
         if cont == 'y':
-            jdd_menu.menu()
+            return jdd_menu.MENU
             
         # Ends the script as the user has specified they're finished using the script
         elif cont == 'n':
             print('Thanks for using my script!')
-            exit()
+            return jdd_menu.QUIT
             
-        # Error for inputs outside of expected values, runs function again
+        # Error for inputs outside of expected values, asks again
         else:
             print('Invalid Imput, please enter y or n')
-            jdd_menu.continue_choice()
+            return jdd_menu.CONTINUE
 
 
 # Driver of the script
@@ -89,4 +164,4 @@ def main():
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -9,9 +9,33 @@ information about the application's state, user details, or other relevant data.
 Key Concepts:
 - 'context': A dictionary passed to menu actions (callbacks), enabling them to behave differently based 
   on the current state or environment.
+- 'MenuContext': A dict-compatible context that counts its changes (a version) and tracks which keys
+  changed, so caches and derived state only recompute what actually changed.
+- 'MenuOption': A compact __slots__ record (text, action, id, flags) for one option, unpackable like a
+  (text, action) tuple.
 - 'JDDMenuBuilder': Used for building the menu with context-aware actions.
 - 'JDDMenu': Displays the menu and handles user interaction, executing actions based on user input and context.
+- 'AsyncJDDMenu': An asyncio version of JDDMenu that reads input without blocking the event loop and
+  awaits 'async def' actions.
 - 'JDDMenuUtils': Useful utility functions to help create menus
+- 'JDDMenuRuleTable': A decision table of named predicates and rules, compiled into a decision tree, that
+  replaces nested dynamic actions and reports which rule fired.
+- 'JDDMenuLoader': Builds menu trees from JSON/TOML definition files, caching the validated tree on disk.
+- 'JDDMenuOutput': A buffered output sink the menu writes through, so output can be batched or redirected.
+- 'JDDMenuTerminalOutput': An output sink for ANSI terminals that redraws the menu in place, rewriting
+  only the lines that changed.
+- 'JDDMenuInput': The source the menu reads selections from: the console, a stream, a file or an iterable.
+- 'JDDMenuKeypressInput': Reads selections from the terminal a keypress at a time (cbreak mode), falling
+  back to line input when stdin is not a terminal.
+- 'JDDMenuOptionProvider': Supplies options lazily from a callable or iterator (database queries, directory
+  listings), evaluated when the menu or page is shown and optionally cached with a TTL.
+- 'JDDMenuSearchIndex': A prefix/trigram index over option texts that powers type-ahead search ('/text').
+- 'JDDMenuMetrics': Per-option latency histograms, call and error counts, render time and input wait,
+  exported as JSON or in the Prometheus text format.
+- 'JDDMenuProfiler': Runs chosen actions (or all of them) under cProfile and/or tracemalloc and writes the
+  reports to a directory.
+- 'JDDMenuJobs': Runs long actions in the background on a bounded thread pool (or a process pool for
+  CPU-bound actions), with a built-in jobs view.
 
 Usage of MenuUtils Features:
 
@@ -30,8 +54,30 @@ Usage of MenuUtils Features:
             ...
 
         # Wrapping the risky action in safe_action_generator
-        safe_action = safe_action_generator(context, risky_action)
-        safe_action()  # Executing the wrapped action safely
+        safe_action = safe_action_generator(risky_action, timeout=5, retries=2, breaker_threshold=3)
+        safe_action(context)  # Executing the wrapped action safely
+        builder.add_option("Risky Action", safe_action)  # Or use it directly as a menu action
+
+    3. Example usage of Memoized Action Generator:
+
+        # The slow permission check only runs again when ctx['user'] changes
+        memoized_action = memoized_action_generator(
+        condition=lambda ctx: directory_says_admin(ctx['user']),
+        action_if_true=admin_action,
+        action_if_false=regular_user_action,
+        keys=['user']
+        )
+
+    4. Example usage of Rule Table Action Generator:
+
+        # One decision table instead of dynamic actions nested three levels deep
+        dashboard = rule_table_action_generator(
+        predicates={'admin': lambda ctx: ctx['role'] == 'admin', 'eu': lambda ctx: ctx['region'] == 'eu'},
+        rules=[('admin-eu', {'admin': True, 'eu': True}, eu_admin_dashboard),
+               ('admin', {'admin': True}, admin_dashboard)],
+        default=user_dashboard
+        )
+        dashboard.decide(context)  # Which rule would fire: 'admin-eu', 'admin' or 'default'
 
 
 
@@ -39,11 +85,52 @@ Create and Provide Context:
    user_context = {'is_admin': True}  # This would be dynamically determined by developers needs
    menu.display_menu(user_context)
 
+   # Or, to let caches see what changed between selections
+   user_context = MenuContext(is_admin=True)
+   menu.display_menu(user_context)
+
 This approach allows for creating menus that are not only interactive but also responsive to the current 
 application state and user roles, enhancing user experience and system functionality.
 
 """
 
+import asyncio
+import bisect
+import codecs
+import collections
+import concurrent.futures
+import contextlib
+import cProfile
+import hashlib
+import heapq
+import importlib
+import inspect
+import itertools
+import json
+import marshal
+import os
+import pickle
+import pstats
+import random
+import re
+import select
+import shutil
+import sys
+import threading
+import time
+import tracemalloc
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11, TOML menu definitions are unavailable
+    tomllib = None
+
+try:
+    import termios
+    import tty
+except ImportError:  # Not a POSIX terminal, JDDMenuKeypressInput falls back to line mode
+    termios = None
+
 
 class JDDMenu:
     """
@@ -54,16 +141,34 @@ class JDDMenu:
     (a function or a method). When a user selects an option, the corresponding action is executed.
 
     Attributes:
-        menu_options (list of tuples): A list where each tuple contains a string (the menu option's
-                                       text) and a callable (the action to be executed when the option
-                                       is selected). The menu options are set during the initialization
+        menu_options (list of MenuOption or tuples): A list where each entry unpacks to a string (the
+                                       menu option's text) and a callable (the action to be executed
+                                       when the option is selected). The menu options are set during the initialization
                                        of the class and determine the behavior of the menu.
+        option_sources (list): The options as given to the constructor. Entries may be
+                               JDDMenuOptionProvider instances, which menu_options expands lazily.
 
     Methods:
         display_menu(): Displays the menu options in the console and waits for the user's input.
                         Executes the action associated with the chosen option. The method handles
                         user input errors and allows for continuous operation until an exit condition
                         is met (like selecting an 'exit' option).
+        load_options(upto): Evaluates option providers, optionally only as far as the given option number.
+        render_frame(): Returns the whole menu frame as one string, cached until the title, options,
+                        exit text or prompt change.
+        invalidate_frame(): Forces the next redraw to rebuild the cached frame and dispatch table.
+        apply_predicates(context): Evaluates the options' visible and enabled predicates in one batch,
+                                   cached until the context changes.
+        dispatch(choice, context): Runs the action of an option, timing it when metrics are enabled and
+                                   profiling it when a profiler is set.
+        run_batch(): Executes scripted selections from the input source without rendering the menu,
+                     stopping cleanly at end of input, and reports throughput.
+        parse_choice(raw_choice): Converts input into an option number; options can be selected by
+                                  number, id or hotkey through a precomputed dispatch table.
+        search(query): Returns the best matching options for a query. Typing '/query' at the prompt
+                       lists the matches with their option numbers.
+        go_to_page(page): Shows another page of a paginated menu. At the prompt, 'n' and 'p' move to
+                          the next and previous page and 'g <page>' jumps to a page.
 
     Usage example:
         # Creating menu options and actions
@@ -78,65 +183,790 @@ class JDDMenu:
         menu.display_menu()
     """
 
-    def __init__(self, menu_options, title="Menu", exit_option_text="Exit", prompt="Select an option: ", cont=False):
+    _PAGE_COMMAND = re.compile(r"g\s*(\d+)")
+
+    def __init__(self, menu_options, title="Menu", exit_option_text="Exit", prompt="Select an option: ", cont=False,
+                 output=None, input_source=None, jobs=None, search_index=None, page_size=None, metrics=None,
+                 profiler=None):
         """
         Initializes a new instance of JDDMenu.
+
+        output may be a JDDMenuOutput or any object with a write() method; by default the menu
+        writes to sys.stdout through a JDDMenuOutput that flushes whenever it prompts for input.
+        input_source may be a JDDMenuInput, a stream or an iterable of selections; by default the
+        menu reads from the console with input().
+        jobs is the JDDMenuJobs instance running this menu's background options, if it has any.
+        search_index is a prebuilt JDDMenuSearchIndex over the option texts; without one the index is
+        built the first time the user searches.
+        page_size limits how many options are shown at once; only the visible page is formatted and
+        written, and options keep their global numbers so any option can be selected from any page.
+        menu_options may include JDDMenuOptionProvider entries, which are only evaluated when the
+        menu (or, for paginated menus, the page that needs them) is shown.
+        metrics is a JDDMenuMetrics collecting per-option latency, render time and input wait; with
+        None (the default) nothing is timed.
+        profiler is a JDDMenuProfiler that runs selected options (or all of them) under cProfile and/or
+        tracemalloc.
+        MenuOption entries with visible or enabled predicates are shown, numbered and dispatched
+        according to those predicates (see apply_predicates).
         """
+        self.option_sources = menu_options
         self.menu_options = menu_options
+        self.options_complete = True
+        self._options_version = 0
+        self._all_sources = menu_options
+        # Plain (text, action) tuples are neither, and usually make up most of a large menu
+        special = [source for source in menu_options if type(source) is not tuple]
+        self._predicated = [source for source in special
+                            if type(source) is MenuOption and (source.visible is not None or source.enabled is not None)]
+        self._predicates_key = None
+        self._disabled = frozenset()
+        self._providers = [source for source in special if isinstance(source, JDDMenuOptionProvider)]
+        if self._providers:
+            self.menu_options = []
+            self.options_complete = False
         self.title = title
         self.exit_option_text = exit_option_text
         self.prompt = prompt
         self.cont = cont
+        self.output = output if isinstance(output, JDDMenuOutput) else JDDMenuOutput(output)
+        self.input_source = input_source if isinstance(input_source, JDDMenuInput) else JDDMenuInput(input_source)
+        self.jobs = jobs
+        # With visibility predicates the shown options differ from the indexed ones
+        self.search_index = search_index if not self._predicated else None
+        self.metrics = metrics
+        self.profiler = profiler
+        if page_size is not None and page_size < 1:
+            raise ValueError("page_size must be at least 1")
+        self.page_size = page_size
+        self.page = 0
+        if jobs is not None and jobs.output is None:
+            jobs.output = self.output
+        self._frame = None
+        self._frame_key = None
+        self._keys = None
+        self._keys_key = None
+        # (source, stats) while run_batch is dispatching, so submenus read from the same script
+        self._batch = None
+
+    def load_options(self, upto=None):
+        """
+        Expands option providers into menu_options.
+
+        Providers are evaluated in order and only as far as needed: options after a provider that
+        still has more to give are not numbered until it is exhausted.
+
+        Parameters:
+        upto (int, optional): The highest option number needed. None evaluates every provider fully.
+        """
+        if not self._providers:
+            return
+        if upto is not None and (self.options_complete or len(self.menu_options) >= upto):
+            return
+
+        options = []
+        complete = True
+        for source in self.option_sources:
+            if not isinstance(source, JDDMenuOptionProvider):
+                options.append(source)
+                continue
+            options.extend(source.options(None if upto is None else max(upto - len(options), 0)))
+            if not source.exhausted:
+                complete = False
+                break
+
+        self.menu_options = options
+        self.options_complete = complete
+        self.search_index = None
+        self._options_version += 1
+
+    def apply_predicates(self, context):
+        """
+        Evaluates the visible and enabled predicates of the options and updates the options shown.
+
+        All predicates are evaluated in one batch, each distinct predicate once, so a predicate shared
+        by many options (such as an is_admin check) runs once per evaluation. Results are kept until a
+        MenuContext's version changes; other contexts can't report changes, so their predicates are
+        evaluated every time. Hidden options are left out of the numbering entirely, and disabled
+        options are shown as unavailable and rejected when selected, so the numbers on screen are the
+        numbers that get dispatched.
+
+        Called before each frame is drawn (and before each scripted selection in run_batch).
+
+        Parameters:
+        context (dict): discussed within the module level docstring
+        """
+        if not self._predicated:
+            return
+        key = (id(context), context.version) if isinstance(context, MenuContext) else None
+        if key is not None and key == self._predicates_key:
+            return
+        self._predicates_key = key
+
+        results = {}
+        for option in self._predicated:
+            for predicate in (option.visible, option.enabled):
+                if predicate is not None and predicate not in results:
+                    result = predicate(context)
+                    if inspect.isawaitable(result):
+                        # An awaitable is always truthy, which would show options meant to be hidden
+                        if inspect.iscoroutine(result):
+                            result.close()
+                        raise TypeError(f"The predicate {predicate!r} returned an awaitable, predicates "
+                                        f"must return a bool")
+                    results[predicate] = bool(result)
+        hidden = {id(option) for option in self._predicated
+                  if option.visible is not None and not results[option.visible]}
+        disabled = frozenset(id(option) for option in self._predicated
+                             if option.enabled is not None and not results[option.enabled])
+
+        sources = [source for source in self._all_sources if id(source) not in hidden] if hidden else self._all_sources
+        if len(sources) != len(self.option_sources) or any(a is not b for a, b in zip(sources, self.option_sources)):
+            self.option_sources = sources
+            if self._providers:
+                self.menu_options = []
+                self.options_complete = False
+            else:
+                self.menu_options = sources
+            self.search_index = None
+            self._options_version += 1
+        if disabled != self._disabled:
+            self._disabled = disabled
+            self._options_version += 1
+
+    def refresh_options(self):
+        """
+        Reloads stale option providers and evaluates as many options as the next frame shows.
+
+        Called once per frame, so providers refresh between frames but never between showing an
+        option and dispatching it.
+        """
+        if not self._providers:
+            return
+        if any([provider.refresh_if_stale() for provider in self._providers]):
+            self.menu_options = []
+            self.options_complete = False
+        if self.page_size is None:
+            self.load_options()
+        else:
+            # One extra option tells whether there is another page
+            self.load_options((self.page + 1) * self.page_size + 1)
+
+    def invalidate_frame(self):
+        """
+        Discards the cached frame and dispatch table so the next redraw rebuilds them.
+
+        Reassigning the title, exit text, prompt or the menu_options list, and appending options,
+        are picked up automatically. Call this after removing, replacing or reordering options in
+        place: a removal followed by an append leaves the list the same length and goes unnoticed.
+        """
+        self._frame = None
+        self._keys = None
+
+    def render_frame(self):
+        """
+        Returns the complete menu frame (title, options, exit line and prompt) as a single string.
+
+        The frame is built once and reused on every redraw until the title, options, exit text or
+        prompt change, so redrawing a large menu costs a single write instead of one print per line.
+
+        Returns:
+        str: The text to write to the console before reading the user's choice.
+        """
+        key = (self.title, id(self.menu_options), len(self.menu_options), self._options_version,
+               self.exit_option_text, self.prompt, self.page_size, self.page)
+        if self._frame is None or key != self._frame_key:
+            lines = [self.title, '-' * len(self.title)]  # Simple underline for the title
+            if self.page_size is None:
+                lines.extend(self._option_lines(self.menu_options, 1))
+            else:
+                # Only the visible slice is formatted, numbered by its position in the whole menu
+                self.page = min(self.page, self.page_count - 1)
+                start = self.page * self.page_size
+                lines.extend(self._option_lines(self.menu_options[start:start + self.page_size], start + 1))
+                more = '' if self.options_complete else '+'
+                lines.append(f"Page {self.page + 1} of {self.page_count - (not self.options_complete)}{more} "
+                             f"(n: next page, p: previous page, g <page>: go to page)")
+            lines.append(f"Enter 0 to {self.exit_option_text}")
+            self._frame = "\n".join(lines) + "\n" + self.prompt
+            self._frame_key = key
+        return self._frame
+
+    @property
+    def dispatch_table(self):
+        """
+        dict: Maps the lowercased id and hotkey of every loaded option to its option number. Built
+              once per change to the options, so looking up a selection costs one dict access.
+        """
+        key = (id(self.menu_options), len(self.menu_options), self._options_version)
+        if self._keys is None or key != self._keys_key:
+            keys = {}
+            for number, option in enumerate(self.menu_options, start=1):
+                if type(option) is MenuOption:
+                    if option.id is not None:
+                        keys.setdefault(option.id.lower(), number)
+                    if option.hotkey is not None:
+                        keys.setdefault(option.hotkey.lower(), number)
+            self._keys = keys
+            self._keys_key = key
+        return self._keys
+
+    def _option_lines(self, options, start):
+        if not self._disabled and not any(type(option) is MenuOption and option.hotkey is not None
+                                          for option in options):
+            return (f"Enter {index} to {option_text}" for index, (option_text, _) in enumerate(options, start=start))
+        return (self._option_line(index, option) for index, option in enumerate(options, start=start))
+
+    def _option_line(self, index, option):
+        hotkey = option.hotkey if type(option) is MenuOption else None
+        line = f"Enter {index} to {option[0]}" if hotkey is None else f"Enter {index} or {hotkey} to {option[0]}"
+        return f"{line} (unavailable)" if id(option) in self._disabled else line
+
+    def parse_choice(self, raw_choice):
+        """
+        Converts a line of user input into an option number.
+
+        Options can be selected by number, or by the id or hotkey they were given in the builder
+        (case-insensitive).
+
+        Parameters:
+        raw_choice (str): The text entered by the user.
+
+        Returns:
+        int: The selected option number, where 0 is the exit option.
+
+        Raises:
+        ValueError: If the input is not a number, id or hotkey, is out of range, or selects a disabled
+                    option.
+        """
+        try:
+            choice = int(raw_choice)
+        except ValueError:
+            key = raw_choice.strip().lower()
+            choice = self.dispatch_table.get(key)
+            if choice is None and not self.options_complete:
+                self.load_options()
+                choice = self.dispatch_table.get(key)
+            if choice is None:
+                raise ValueError(f"No option with number, id or hotkey {raw_choice.strip()!r}") from None
+        else:
+            if choice > len(self.menu_options):
+                self.load_options(choice)
+            if choice < 0 or choice > len(self.menu_options):
+                raise ValueError("Selection out of range")
+        if self._disabled and choice and id(self.menu_options[choice - 1]) in self._disabled:
+            raise ValueError(f"Option {choice} is not available")
+        return choice
+
+    def search(self, query, limit=10):
+        """
+        Finds the options that best match a query.
+
+        Options whose text starts with the query rank first, then options with words starting with
+        each word of the query, then options containing the query anywhere. The index is built on
+        the first search and extended as options are appended.
+
+        Parameters:
+        query (str): The text to look for (case-insensitive).
+        limit (int): The maximum number of matches to return.
+
+        Returns:
+        list of tuples: (option number, option text) pairs, best match first.
+        """
+        self.load_options()
+        index = self.search_index
+        if index is None or len(index) > len(self.menu_options):
+            index = self.search_index = JDDMenuSearchIndex()
+        if len(index) < len(self.menu_options):
+            index.extend(option_text for option_text, _ in self.menu_options[len(index):])
+        return [(position + 1, self.menu_options[position][0]) for position in index.search(query, limit)]
+
+    @property
+    def page_count(self):
+        """
+        int: The number of pages in a paginated menu (1 when the menu is not paginated). While option
+             providers still have more to give, this counts one page past the options loaded so far.
+        """
+        if self.page_size is None:
+            return 1
+        pages = max(1, -(-len(self.menu_options) // self.page_size))
+        if not self.options_complete:
+            pages += 1
+        return pages
+
+    def go_to_page(self, page):
+        """
+        Selects the page shown by the next redraw.
+
+        Parameters:
+        page (int): The page number, starting at 1.
+
+        Raises:
+        ValueError: If the page does not exist.
+        """
+        if page > self.page_count and not self.options_complete:
+            self.load_options(page * self.page_size + 1)
+        if page < 1 or page > self.page_count:
+            raise ValueError(f"Page must be between 1 and {self.page_count}")
+        self.page = page - 1
+
+    def handle_command(self, raw_choice):
+        """
+        Handles menu commands typed at the prompt instead of an option number.
+
+        Commands:
+            /text: Lists the options matching 'text' with their numbers.
+            n, p: Shows the next or previous page of a paginated menu.
+            g <page>: Jumps to a page of a paginated menu.
 
+        Option ids and hotkeys take precedence over the page commands (the builder does not allow
+        'n' or 'p' as ids or hotkeys of paginated menus).
+
+        Parameters:
+        raw_choice (str): The text entered by the user.
+
+        Returns:
+        bool or None: None if the input was not a command, otherwise whether the menu frame needs
+                      to be redrawn.
+
+        Raises:
+        ValueError: If a page command asks for a page that does not exist.
+        """
+        if raw_choice.startswith('/'):
+            matches = self.search(raw_choice[1:])
+            if not matches:
+                self.output.print("No matching options.")
+            for number, option_text in matches:
+                self.output.print(f"Enter {number} to {option_text}")
+            return False
+
+        if self.page_size is not None:
+            command = raw_choice.strip().lower()
+            if command in self.dispatch_table:
+                return None
+            if command == 'n':
+                self.go_to_page(min(self.page + 2, self.page_count))
+                return True
+            if command == 'p':
+                self.go_to_page(max(self.page, 1))
+                return True
+            if command == 'g':
+                raise ValueError(f"Enter g followed by a page number between 1 and {self.page_count}")
+            page = self._PAGE_COMMAND.fullmatch(command)
+            if page is not None:
+                self.go_to_page(int(page.group(1)))
+                return True
+        return None
+
+    def show_frame(self, redraw=True, context=None):
+        """
+        Writes the menu frame (or, when redraw is False, just the prompt) and flushes the output.
+
+        Parameters:
+        redraw (bool): Evaluate option predicates, refresh option providers and write the whole frame.
+        context (dict): The context option predicates are evaluated against.
+        """
+        if self.metrics is not None:
+            start = time.perf_counter()
+        if redraw:
+            self.apply_predicates(context)
+            self.refresh_options()
+            self.output.frame(self.render_frame())
+        else:
+            self.output.prompt(self.prompt)
+        if self.metrics is not None:
+            self.metrics.observe_render(self.title, time.perf_counter() - start)
+
+    def read_line(self):
+        """
+        Reads the next line from the input source.
+
+        Returns:
+        str: The line read.
+
+        Raises:
+        EOFError: If there is no more input.
+        """
+        if self.metrics is None:
+            return self.input_source.read_line()
+        start = time.perf_counter()
+        try:
+            return self.input_source.read_line()
+        finally:
+            self.metrics.observe_input(self.title, time.perf_counter() - start)
+
+    def expect_choice(self):
+        """
+        Tells a keypress input source which single keys complete a selection: the option numbers,
+        hotkeys and ids of one character, and the page commands of paginated menus.
+        """
+        if self.input_source.keypress:
+            option_count = len(self.menu_options) if self.options_complete else None
+            commands = ('n', 'p') if self.page_size is not None else ()
+            self.input_source.expect(option_count, self.dispatch_table, commands)
+
+    def dispatch(self, choice, context):
+        """
+        Runs the action of an option, recording its latency and any error when metrics are enabled and
+        profiling it when the profiler asks for it.
+
+        Parameters:
+        choice (int): The option number (1 for the first option).
+        context (dict): discussed within the module level docstring
+
+        Returns:
+        The action's return value.
+        """
+        option_text, action = self.menu_options[choice - 1]
+        with self.output.capture():
+            if self.profiler is not None and self.profiler.wants(self.title, option_text):
+                with self.profiler.profile(self.title, option_text):
+                    return self._run_action(option_text, action, context)
+            return self._run_action(option_text, action, context)
+
+    def _run_action(self, option_text, action, context):
+        if self.metrics is None:
+            return action(context)
+        start = time.perf_counter()
+        try:
+            result = action(context)
+        except Exception:
+            self.metrics.observe_action(self.title, option_text, time.perf_counter() - start, error=True)
+            raise
+        self.metrics.observe_action(self.title, option_text, time.perf_counter() - start)
+        return result
 
     def display_menu(self, context=None):
         """
         Displays the menu and handles user input to execute corresponding actions.
+
+        The menu exits when the user selects the exit option or the input source reaches end of
+        input (for example a closed pipe). After a command such as a search only the prompt is
+        shown again, so the results stay on screen.
         """
+        redraw = True
         while True:
-            print(self.title)
-            print('-' * len(self.title))  # Simple underline for the title
-
-            for index, (option_text, _) in enumerate(self.menu_options, start=1):
-                print(f"Enter {index} to {option_text}")
-            
-            print(f"Enter 0 to {self.exit_option_text}")
+            self.show_frame(redraw, context)
+            redraw = True
 
             try:
-                choice = int(input(self.prompt))
-                if choice < 0 or choice > len(self.menu_options):
-                    raise ValueError("Selection out of range")
+                self.expect_choice()
+                raw_choice = self.read_line()
+                handled = self.handle_command(raw_choice)
+                if handled is not None:
+                    redraw = handled
+                    continue
+
+                choice = self.parse_choice(raw_choice)
 
                 if choice == 0:
-                    print("Exiting menu.")
+                    self.output.print("Exiting menu.")
+                    self.output.flush()
                     break
 
-                _, action = self.menu_options[choice - 1]
-                action(context)
+                self.dispatch(choice, context)
                 if self.cont:
                     self.continue_choice()
 
             except ValueError as e:
-                print(f"Invalid selection: {e}. Please try again.")
+                self.output.print(f"Invalid selection: {e}. Please try again.")
 
-    
+            except EOFError:
+                self.output.print("Exiting menu.")
+                self.output.flush()
+                break
+
+    def run_batch(self, context=None, source=None):
+        """
+        Executes scripted selections as fast as they can be dispatched.
+
+        Selections are read from the menu's input source (or the given source) one line at a time.
+        Nothing is rendered and the continue prompt is skipped. Processing stops at end of input
+        or when the exit option is selected; invalid selections are reported and skipped. Submenus
+        entered along the way read their selections from the same source, also without rendering,
+        and their selections count towards the returned totals.
+
+        Parameters:
+        context (dict): discussed within the module level docstring
+        source (JDDMenuInput, stream or iterable, optional): Where to read selections from instead
+                                                             of the menu's input source.
+
+        Returns:
+        dict: 'selections' (actions executed), 'invalid' (selections rejected), 'elapsed' (seconds)
+              and 'throughput' (selections per second).
+        """
+        if source is None:
+            source = self.input_source
+        elif not isinstance(source, JDDMenuInput):
+            source = JDDMenuInput(source)
+
+        stats = {'selections': 0, 'invalid': 0}
+        start = time.perf_counter()
+        self._batch_loop(context, source, stats)
+        selections, invalid = stats['selections'], stats['invalid']
+
+        elapsed = time.perf_counter() - start
+        throughput = selections / elapsed if elapsed > 0 else 0.0
+        self.output.print(f"Processed {selections} selections ({invalid} invalid) in {elapsed:.3f}s "
+                          f"({throughput:.0f}/s).")
+        self.output.flush()
+        return {'selections': selections, 'invalid': invalid, 'elapsed': elapsed, 'throughput': throughput}
+
+    def _batch_loop(self, context, source, stats):
+        """
+        Dispatches selections read from source until end of input or the exit option, counting
+        them in stats. Submenus entered meanwhile read from the same source (see JDDMenuSubmenu),
+        so a script can walk a whole menu tree.
+
+        Parameters:
+        context (dict): discussed within the module level docstring
+        source (JDDMenuInput): Where to read selections from.
+        stats (dict): 'selections' and 'invalid' counters to add to.
+        """
+        self.apply_predicates(context)
+        self.refresh_options()
+        previous, self._batch = self._batch, (source, stats)
+        try:
+            while True:
+                try:
+                    self.apply_predicates(context)
+                    choice = self.parse_choice(source.read_line())
+                except ValueError as e:
+                    stats['invalid'] += 1
+                    self.output.print(f"Invalid selection: {e}.")
+                    continue
+                except EOFError:
+                    break
+
+                if choice == 0:
+                    break
+
+                self.dispatch(choice, context)
+                stats['selections'] += 1
+        finally:
+            self._batch = previous
 
     def continue_choice(self):
         """
         Prompts the user to either continue using the application or exit.
+
+        Reaching end of input is treated as answering 'no'.
         """
         while True:
             try:
-                continue_choice = input("Do you want to continue? (yes/no): ").lower()
+                self.output.prompt("Do you want to continue? (yes/no): ")
+                self.input_source.expect(commands=('y', 'n'))
+                try:
+                    continue_choice = self.input_source.read_line().lower()
+                except EOFError:
+                    continue_choice = 'no'
                 if continue_choice in ['yes', 'y']:
                     break  # Breaks out of the continue_choice loop and goes back to the main menu
                 elif continue_choice in ['no', 'n']:
-                    print("Exiting menu.")
+                    self.output.print("Exiting menu.")
+                    self.output.flush()
                     exit()  # Exits the program
                 else:
                     raise ValueError
             except ValueError:
-                print("Invalid input. Please answer with 'yes' or 'no'.")
+                self.output.print("Invalid input. Please answer with 'yes' or 'no'.")
+
+
+class AsyncJDDMenu(JDDMenu):
+    """
+    An asyncio-native version of JDDMenu.
+
+    AsyncJDDMenu reads the user's input in a daemon thread, so the event loop stays free to run the
+    host application's other coroutines while the menu waits for a selection. Actions can be plain
+    callables or 'async def' functions (anything returning an awaitable is awaited), which lets slow
+    I/O-bound actions run without freezing the rest of the application.
+
+    display_menu(), continue_choice(), run_batch(), read_line() and dispatch() are coroutines;
+    everything else behaves exactly like JDDMenu.
+
+    Usage example:
+        async def fetch_report(ctx):
+            await asyncio.sleep(1)
+            print("Report fetched.")
+
+        async def main():
+            menu = JDDMenuBuilder().add_option("Fetch report", fetch_report).build_async()
+            await asyncio.gather(menu.display_menu(), background_task())
+
+        asyncio.run(main())
+    """
+
+    async def read_line(self):
+        """
+        Reads the next line from the input source without blocking the event loop.
+
+        Returns:
+        str: The line read.
+
+        Raises:
+        EOFError: If there is no more input.
+        """
+        if self.metrics is None:
+            return await self.input_source.read_line_async()
+        start = time.perf_counter()
+        try:
+            return await self.input_source.read_line_async()
+        finally:
+            self.metrics.observe_input(self.title, time.perf_counter() - start)
+
+    async def run_action(self, action, context):
+        """
+        Runs an action, awaiting its result if it is awaitable.
+
+        Parameters:
+        action (callable): The action to run.
+        context (dict): discussed within the module level docstring
+        """
+        result = action(context)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    async def dispatch(self, choice, context):
+        """
+        Runs the action of an option, awaiting it if needed, recording its latency and any error
+        when metrics are enabled and profiling it when the profiler asks for it. The profile of an
+        awaitable action also covers whatever else the event loop runs while it is awaited.
+
+        Parameters:
+        choice (int): The option number (1 for the first option).
+        context (dict): discussed within the module level docstring
+
+        Returns:
+        The action's return value.
+        """
+        option_text, action = self.menu_options[choice - 1]
+        with self.output.capture():
+            if self.profiler is not None and self.profiler.wants(self.title, option_text):
+                with self.profiler.profile(self.title, option_text):
+                    return await self._run_action(option_text, action, context)
+            return await self._run_action(option_text, action, context)
+
+    async def _run_action(self, option_text, action, context):
+        if self.metrics is None:
+            return await self.run_action(action, context)
+        start = time.perf_counter()
+        try:
+            result = await self.run_action(action, context)
+        except Exception:
+            self.metrics.observe_action(self.title, option_text, time.perf_counter() - start, error=True)
+            raise
+        self.metrics.observe_action(self.title, option_text, time.perf_counter() - start)
+        return result
+
+    async def display_menu(self, context=None):
+        """
+        Displays the menu and handles user input to execute corresponding actions.
+
+        The menu exits when the user selects the exit option or the input source reaches end of input.
+        """
+        redraw = True
+        while True:
+            self.show_frame(redraw, context)
+            redraw = True
+
+            try:
+                self.expect_choice()
+                raw_choice = await self.read_line()
+                handled = self.handle_command(raw_choice)
+                if handled is not None:
+                    redraw = handled
+                    continue
+
+                choice = self.parse_choice(raw_choice)
+
+                if choice == 0:
+                    self.output.print("Exiting menu.")
+                    self.output.flush()
+                    break
+
+                await self.dispatch(choice, context)
+                if self.cont:
+                    await self.continue_choice()
+
+            except ValueError as e:
+                self.output.print(f"Invalid selection: {e}. Please try again.")
+
+            except EOFError:
+                self.output.print("Exiting menu.")
+                self.output.flush()
+                break
+
+    async def run_batch(self, context=None, source=None):
+        """
+        Executes scripted selections as fast as they can be dispatched, awaiting async actions.
+
+        See JDDMenu.run_batch for the parameters and the returned statistics.
+        """
+        if source is None:
+            source = self.input_source
+        elif not isinstance(source, JDDMenuInput):
+            source = JDDMenuInput(source)
+
+        stats = {'selections': 0, 'invalid': 0}
+        start = time.perf_counter()
+        await self._batch_loop(context, source, stats)
+        selections, invalid = stats['selections'], stats['invalid']
+
+        elapsed = time.perf_counter() - start
+        throughput = selections / elapsed if elapsed > 0 else 0.0
+        self.output.print(f"Processed {selections} selections ({invalid} invalid) in {elapsed:.3f}s "
+                          f"({throughput:.0f}/s).")
+        self.output.flush()
+        return {'selections': selections, 'invalid': invalid, 'elapsed': elapsed, 'throughput': throughput}
+
+    async def _batch_loop(self, context, source, stats):
+        """
+        Awaiting counterpart of JDDMenu._batch_loop.
+        """
+        self.apply_predicates(context)
+        self.refresh_options()
+        previous, self._batch = self._batch, (source, stats)
+        try:
+            while True:
+                try:
+                    self.apply_predicates(context)
+                    choice = self.parse_choice(await source.read_line_async())
+                except ValueError as e:
+                    stats['invalid'] += 1
+                    self.output.print(f"Invalid selection: {e}.")
+                    continue
+                except EOFError:
+                    break
+
+                if choice == 0:
+                    break
+
+                await self.dispatch(choice, context)
+                stats['selections'] += 1
+        finally:
+            self._batch = previous
+
+    async def continue_choice(self):
+        """
+        Prompts the user to either continue using the application or exit.
+
+        Reaching end of input is treated as answering 'no'.
+        """
+        while True:
+            self.output.prompt("Do you want to continue? (yes/no): ")
+            self.input_source.expect(commands=('y', 'n'))
+            try:
+                continue_choice = (await self.read_line()).lower()
+            except EOFError:
+                continue_choice = 'no'
+            if continue_choice in ['yes', 'y']:
+                break
+            elif continue_choice in ['no', 'n']:
+                self.output.print("Exiting menu.")
+                self.output.flush()
+                exit()  # Exits the program
+            else:
+                self.output.print("Invalid input. Please answer with 'yes' or 'no'.")
 
 
 class JDDMenuBuilder:
@@ -152,16 +982,31 @@ class JDDMenuBuilder:
         - Parameterized Callbacks: Supports actions that accept additional parameters for enhanced flexibility.
 
     Attributes:
-        menu_options (list of tuples): An internal list that stores the menu options 
-                                       and their corresponding actions. Each tuple in
-                                       this list contains a string (the text of the 
-                                       menu option) and a callable (the action to be 
-                                       executed when the option is selected).
+        menu_options (list of MenuOption or tuples): An internal list that stores the menu options 
+                                       and their corresponding actions. Each entry holds a
+                                       string (the text of the menu option) and a callable
+                                       (the action to be executed when the option is
+                                       selected); options with an id, hotkey, predicates or
+                                       flags are MenuOption records, plain ones are tuples.
+        option_keys (dict): Maps the lowercased ids and hotkeys in use to their option's text.
 
     Methods:
+        add_submenu(option_text, submenu): Adds an option that opens a child menu, built on first entry and cached.
+        add_option_provider(source, ttl, cache): Adds options produced lazily by a callable or iterator.
         add_option(option_text, action):Adds a menu option to the internal list. Allows
                                         chaining for adding multiple options in a fluent manner.
+                                        Pass background=True to run the action on a thread pool,
+                                        or process=True to run it in a worker process, id= or
+                                        hotkey= to make it selectable by more than its number, and
+                                        visible= or enabled= to show it only when a predicate holds.
+        set_metrics(metrics): Records per-option latency, render time and input wait.
+        set_profiler(profiler): Profiles selected actions with cProfile and/or tracemalloc.
+        set_page_size(page_size): Shows the options one page at a time.
+        enable_search(): Indexes the options for type-ahead search as they are added.
+        set_job_limits(max_workers, max_pending, max_processes): Bounds the pools used by background
+                                        and process options.
         build(): Finalizes the construction of the JDDMenu object and returns it.
+        build_async(): Finalizes the construction of an AsyncJDDMenu object and returns it.
 
     Usage example:
         # Define actions for the menu
@@ -187,6 +1032,11 @@ class JDDMenuBuilder:
         builder.add_option("Parameterized Action", lambda ctx: action_with_params(ctx, "param1", "param2"))
         builder.add_option("Safe Action", lambda ctx: safe_action(ctx))
         builder.add_option("Dynamic Action", dynamic_action)
+        builder.add_option("Export to Excel", "reports.excel:export", id="export-excel", hotkey="x")
+        builder.add_option("Generate Report", generate_report, background=True)
+        builder.add_option("Crunch Numbers", crunch_numbers, process=True)
+        builder.add_option_provider(lambda: ((host, connect_to(host)) for host in list_hosts()), ttl=60)
+        builder.add_submenu("Settings", lambda: JDDMenuBuilder().set_title("Settings").add_option(...))
     """
 
     def __init__(self):
@@ -198,26 +1048,232 @@ class JDDMenuBuilder:
         and default values for title, exit option text, and prompt.
         """
         self.menu_options = []
+        self.option_keys = {}
         self.title = "Menu"
         self.exit_option_text = "Exit"
         self.prompt = "Select an option: "
-
-    def add_option(self, option_text, action):
+        self.output = None
+        self.input_source = None
+        self.jobs = None
+        self.jobs_option_text = "View background jobs"
+        self.search_index = None
+        self.page_size = None
+        self.metrics = None
+        self.profiler = None
+        self.version = 0
+
+    def add_option(self, option_text, action, background=False, process=False, id=None, hotkey=None,
+                   visible=None, enabled=None):
         """
         Adds a menu option along with its corresponding action to the builder.
 
+        Background options are submitted to a bounded thread pool and the menu comes back
+        immediately; their progress is shown by a "View background jobs" option that the builder
+        adds at the end of the menu.
+
+        Process options work the same way but run in a worker process, so CPU-bound actions can use
+        every core. The action must be picklable (a function defined at module level) and receives a
+        copy of the picklable entries of the context, so changes it makes to the context are not
+        seen by the menu; return a value instead, it is shown in the jobs view.
+
+        The action can also be given as a 'module:function' reference. The module is then only
+        imported the first time the option is selected, so heavy dependencies don't slow down
+        startup.
+
+        An id and a hotkey let users and scripts select the option without its number, which
+        changes whenever options are inserted before it. Both are case-insensitive and must be
+        unique within the menu.
+
+        visible and enabled are predicates taking the context. Hidden options are left out of the
+        menu and its numbering; disabled options are shown as unavailable and can't be selected.
+        The menu evaluates them once per frame, and only again after a MenuContext changes, so
+        options for different roles can share one builder.
+
         Parameters:
         option_text (str): The text displayed for the menu option.
-        action (callable): The action (function) to execute when this menu option is selected.
+        action (callable or str): The action (function) to execute when this menu option is selected,
+                                  or a 'module:function' reference to it.
+        background (bool): Run the action in the background instead of waiting for it.
+        process (bool): Run the action in the background in a worker process.
+        id (str, optional): A stable identifier the option can be selected by. It must not be a number.
+        hotkey (str, optional): A single character (not a number) the option can be selected by.
+        visible (callable or str, optional): Whether the option is shown, or a 'module:function'
+                                             reference to such a predicate.
+        enabled (callable or str, optional): Whether the option can be selected, or a reference.
+                                             Predicates are called synchronously, also in async menus.
 
         Returns:
         JDDMenuBuilder: The instance of the builder to allow for method chaining.
         """
+        # Plain options are by far the most common, and large menus add thousands of them. Without
+        # an id, hotkey, predicate or flag they are stored as (text, action) tuples, which are
+        # smaller and quicker to create than MenuOption records.
+        if (id is None and hotkey is None and visible is None and enabled is None and not (background or process)
+                and self.search_index is None and type(action) is not str and callable(action)
+                and not isinstance(action, JDDMenuSubmenu)):
+            self.menu_options.append((sys.intern(option_text) if type(option_text) is str else option_text, action))
+            self.version += 1
+            return self
+
+        if visible is not None or enabled is not None:
+            predicates = []
+            for predicate in (visible, enabled):
+                if isinstance(predicate, str):
+                    predicate = JDDMenuLazyAction(predicate)
+                if predicate is not None and not callable(predicate):
+                    raise ValueError("The provided visible and enabled predicates must be callable")
+                if inspect.iscoroutinefunction(predicate):
+                    raise ValueError("The visible and enabled predicates must be plain functions, not coroutines")
+                predicates.append(predicate)
+            visible, enabled = predicates
+
+        if id is not None or hotkey is not None:
+            if hotkey is not None and len(hotkey) != 1:
+                raise ValueError("A hotkey must be a single character")
+            keys = [key for key in (id, hotkey) if key is not None]
+            for key in keys:
+                if not self._usable_key(key):
+                    raise ValueError(f"{key!r} can't be used as an option id or hotkey")
+                if key.lower() in self.option_keys:
+                    raise ValueError(f"{key!r} is already used by the option {self.option_keys[key.lower()]!r}")
+            if len({key.lower() for key in keys}) < len(keys):
+                raise ValueError("An option's id and hotkey must differ")
+
+        flags = 0
+        if isinstance(action, str):
+            action = JDDMenuLazyAction(action)
+            flags |= MenuOption.LAZY
+
         # Error Prevention 
         if not callable(action):
             raise ValueError("The provided action is not callable")
-        
-        self.menu_options.append((option_text, action))
+
+        if process:
+            try:
+                pickle.dumps(action)
+            except Exception:
+                raise ValueError("Process actions must be picklable, define them at module level") from None
+
+        if background or process:
+            if self.jobs is None:
+                self.jobs = JDDMenuJobs()
+            action = self.jobs.background_action(option_text, action, process=process)
+            flags |= MenuOption.PROCESS if process else MenuOption.BACKGROUND
+        if isinstance(action, JDDMenuSubmenu):
+            flags |= MenuOption.SUBMENU
+
+        if flags or id is not None or hotkey is not None or visible is not None or enabled is not None:
+            self.menu_options.append(MenuOption(option_text, action, id, flags, hotkey, visible, enabled))
+        else:
+            self.menu_options.append((sys.intern(option_text) if type(option_text) is str else option_text, action))
+        if id is not None or hotkey is not None:
+            self.option_keys.update((key.lower(), option_text) for key in keys)
+        if self.search_index is not None:
+            if len(self.search_index) != len(self.menu_options) - 1:
+                self.search_index = JDDMenuSearchIndex(text for text, _ in self._static_options()[:-1])
+            self.search_index.add(option_text)
+        self.version += 1
+        return self
+
+    def add_submenu(self, option_text, submenu, id=None, hotkey=None, visible=None, enabled=None):
+        """
+        Adds an option that opens another menu.
+
+        The child menu is only built the first time the user enters it, and the built menu is kept
+        and reused on later visits. It is rebuilt only when its builder has changed since. Choosing
+        the child's exit option returns to this menu as it was, without rebuilding it.
+
+        Unless the child builder sets its own, the child shares this menu's output and input source.
+
+        Parameters:
+        option_text (str): The text displayed for the menu option.
+        submenu (JDDMenuBuilder or callable): The child menu's builder, or a callable that returns
+                                              one, called on first entry so that building the
+                                              definition itself is deferred too.
+        id (str, optional): A stable identifier the option can be selected by.
+        hotkey (str, optional): A single character the option can be selected by.
+        visible (callable, optional): Whether the option is shown (see add_option).
+        enabled (callable, optional): Whether the option can be selected (see add_option).
+
+        Returns:
+        JDDMenuBuilder: The instance of the builder to allow for method chaining.
+        """
+        if not isinstance(submenu, JDDMenuSubmenu):
+            submenu = JDDMenuSubmenu(submenu)
+        return self.add_option(option_text, submenu, id=id, hotkey=hotkey, visible=visible, enabled=enabled)
+
+    def add_option_provider(self, source, ttl=None, cache=True):
+        """
+        Adds options supplied lazily by a callable or an iterator.
+
+        The provider is evaluated when the menu is shown rather than when it is built, and paginated
+        menus only pull as many options as the visible page needs.
+
+        Parameters:
+        source (callable or iterable): A callable returning an iterable of (option_text, action)
+                                       pairs, or an iterator/generator yielding them.
+        ttl (float, optional): Seconds before a callable provider is evaluated again. None keeps the
+                               options until the menu is rebuilt.
+        cache (bool): Set to False to evaluate a callable provider every time the menu is shown.
+
+        Returns:
+        JDDMenuBuilder: The instance of the builder to allow for method chaining.
+        """
+        if not isinstance(source, JDDMenuOptionProvider):
+            source = JDDMenuOptionProvider(source, ttl, cache)
+        self.menu_options.append(source)
+        # Provider options are only known once the menu runs, so the menu indexes them itself
+        self.search_index = None
+        self.version += 1
+        return self
+
+    def enable_search(self):
+        """
+        Builds the search index now and keeps it up to date as options are added, so large menus
+        don't pay for indexing on the first search. Menus with option providers can't be indexed
+        ahead of time; they build the index on the first search instead.
+
+        Returns:
+        JDDMenuBuilder: The instance of the builder to allow for method chaining.
+        """
+        if self.search_index is None and not any(isinstance(option, JDDMenuOptionProvider)
+                                                 for option in self.menu_options):
+            self.search_index = JDDMenuSearchIndex(option_text for option_text, _ in self._static_options())
+        return self
+
+    @staticmethod
+    def _usable_key(key):
+        # Anything int() accepts ('+3', '1_0', ...) would be read as an option number instead
+        if not key.strip() or key != key.strip() or key.startswith('/'):
+            return False
+        try:
+            int(key)
+        except ValueError:
+            return True
+        return False
+
+    def _static_options(self):
+        return [option for option in self.menu_options if not isinstance(option, JDDMenuOptionProvider)]
+
+    def set_job_limits(self, max_workers=4, max_pending=16, max_processes=None):
+        """
+        Sets how many background jobs can run at once and how many more can wait in the queue.
+
+        Parameters:
+        max_workers (int): The number of worker threads.
+        max_pending (int): The number of jobs allowed to wait for a free worker. Further submissions
+                           are rejected until the queue drains.
+        max_processes (int, optional): The number of worker processes for process options.
+                                       Defaults to the number of CPUs.
+
+        Returns:
+        JDDMenuBuilder: The instance of the builder to allow for method chaining.
+        """
+        if self.jobs is None:
+            self.jobs = JDDMenuJobs(max_workers, max_pending, max_processes)
+        else:
+            self.jobs.set_limits(max_workers, max_pending, max_processes)
+        self.version += 1
         return self
 
     def set_title(self, title):
@@ -231,6 +1287,7 @@ class JDDMenuBuilder:
         JDDMenuBuilder: The instance of the builder to allow for method chaining.
         """
         self.title = title
+        self.version += 1
         return self
 
     def set_exit_option_text(self, text):
@@ -244,6 +1301,7 @@ class JDDMenuBuilder:
         JDDMenuBuilder: The instance of the builder to allow for method chaining.
         """
         self.exit_option_text = text
+        self.version += 1
         return self
 
     def set_prompt(self, prompt):
@@ -257,27 +1315,867 @@ class JDDMenuBuilder:
         JDDMenuBuilder: The instance of the builder to allow for method chaining.
         """
         self.prompt = prompt
+        self.version += 1
         return self
 
-    def build(self):
+    def set_page_size(self, page_size):
         """
-        Constructs and returns a JDDMenu object with the configured options, title, exit text, and prompt.
+        Shows the options one page at a time, for menus too long to print in full.
+
+        Parameters:
+        page_size (int or None): The number of options per page, or None to show every option.
 
         Returns:
-        JDDMenu: The constructed JDDMenu object with the specified settings.
+        JDDMenuBuilder: The instance of the builder to allow for method chaining.
         """
-        return JDDMenu(self.menu_options, self.title, self.exit_option_text, self.prompt)
+        self.page_size = page_size
+        self.version += 1
+        return self
 
+    def set_metrics(self, metrics):
+        """
+        Enables latency and throughput metrics for the menu (and its submenus, unless they set their own).
 
-class JDDMenuUtils:
-    """
-    A utility class for the JDDMenu system, providing various helper methods to enhance menu functionality.
+        Parameters:
+        metrics (JDDMenuMetrics or None): The collector to record into, or None to disable metrics.
 
-    JDDMenuUtils includes static methods that aid in creating and managing dynamic menu options and actions.
-    These utilities are designed to offer additional flexibility and robust error handling for menu items,
-    making it easier to create complex, context-aware, and error-resilient menu systems.
+        Returns:
+        JDDMenuBuilder: The instance of the builder to allow for method chaining.
+        """
+        self.metrics = metrics
+        self.version += 1
+        return self
 
-    The class includes methods for generating actions based on certain conditions and safely executing actions 
+    def set_profiler(self, profiler):
+        """
+        Enables profiling of the menu's actions (and its submenus' actions, unless they set their own).
+
+        Parameters:
+        profiler (JDDMenuProfiler or None): The profiler deciding which options to profile, or None.
+
+        Returns:
+        JDDMenuBuilder: The instance of the builder to allow for method chaining.
+        """
+        self.profiler = profiler
+        self.version += 1
+        return self
+
+    def set_output(self, output):
+        """
+        Sets where the menu writes its output. Pass a JDDMenuTerminalOutput to redraw the menu in
+        place on ANSI terminals instead of writing it again each time.
+
+        Parameters:
+        output (JDDMenuOutput or stream): A JDDMenuOutput sink, or any object with a write() method
+                                          (a file, socket file object or io.StringIO) to wrap in one.
+
+        Returns:
+        JDDMenuBuilder: The instance of the builder to allow for method chaining.
+        """
+        self.output = output
+        self.version += 1
+        return self
+
+    def set_input(self, input_source):
+        """
+        Sets where the menu reads the user's selections from. Pass a JDDMenuKeypressInput to select
+        options with a single keypress at the terminal.
+
+        Parameters:
+        input_source (JDDMenuInput, stream or iterable): A JDDMenuInput, or a file-like object or
+                                                         iterable of selection strings to wrap in one.
+
+        Returns:
+        JDDMenuBuilder: The instance of the builder to allow for method chaining.
+        """
+        self.input_source = input_source
+        self.version += 1
+        return self
+
+    def build(self):
+        """
+        Constructs and returns a JDDMenu object with the configured options, title, exit text, and prompt.
+
+        Returns:
+        JDDMenu: The constructed JDDMenu object with the specified settings.
+        """
+        return self._build(JDDMenu)
+
+    def build_async(self):
+        """
+        Constructs and returns an AsyncJDDMenu object with the configured settings.
+
+        Options added to the builder may be plain callables or 'async def' functions.
+
+        Returns:
+        AsyncJDDMenu: The constructed AsyncJDDMenu object with the specified settings.
+        """
+        return self._build(AsyncJDDMenu)
+
+    def _build(self, menu_class):
+        if self.page_size is not None and not self.option_keys.keys().isdisjoint(('n', 'p')):
+            raise ValueError("'n' and 'p' are page commands in a paginated menu, they can't be option ids or hotkeys")
+        menu_options = self.menu_options
+        search_index = self.search_index
+        if self.jobs is not None:
+            menu_options = menu_options + [MenuOption(self.jobs_option_text, self.jobs.view_jobs)]
+        if search_index is not None and len(search_index) != len(self.menu_options):
+            # The options were changed behind the builder's back
+            search_index = None
+        menu = menu_class(menu_options, self.title, self.exit_option_text, self.prompt, output=self.output,
+                          input_source=self.input_source, jobs=self.jobs, search_index=search_index,
+                          page_size=self.page_size, metrics=self.metrics,
+                          profiler=self.profiler)
+        for option in self.menu_options:
+            if type(option) is not tuple and isinstance(option, MenuOption) and option.flags & MenuOption.SUBMENU:
+                option.action.attach(menu)
+        return menu
+
+
+class MenuOption:
+    """
+    A menu option: its text, its action, an optional id and hotkey, and flags describing the option.
+
+    MenuOption uses __slots__ so per-option data (ids, hotkeys, flags, predicates) lives on the option
+    rather than in side tables keyed by position. Option texts are interned, so catalogs repeating
+    the same labels store each label once. A record still costs more than a (text, action) tuple,
+    so JDDMenuBuilder only creates one for options that carry such data and stores plain options
+    as tuples with interned texts.
+
+    A MenuOption unpacks like the (option_text, action) tuples menus have always used, so
+    `for option_text, action in menu.menu_options` and `option[0]` keep working, and plain tuples
+    are still accepted wherever options are.
+
+    Attributes:
+        text (str): The text displayed for the option.
+        action (callable): The action executed when the option is selected.
+        id (str or None): A stable identifier the option can be selected by, whatever its position.
+        hotkey (str or None): A single character the option can be selected by.
+        flags (int): A combination of the BACKGROUND, PROCESS, SUBMENU and LAZY bits.
+        visible (callable or None): Takes the context and returns whether the option is shown.
+        enabled (callable or None): Takes the context and returns whether the option can be selected.
+    """
+
+    __slots__ = ('text', 'action', 'id', 'hotkey', 'flags', 'visible', 'enabled')
+
+    BACKGROUND = 1  # runs on the jobs thread pool
+    PROCESS = 2     # runs in a jobs worker process
+    SUBMENU = 4     # the action is a JDDMenuSubmenu
+    LAZY = 8        # the action is a 'module:function' reference resolved on first use
+
+    def __init__(self, text, action, id=None, flags=0, hotkey=None, visible=None, enabled=None):
+        """
+        Initializes a new instance of MenuOption.
+        """
+        self.text = sys.intern(text) if type(text) is str else text
+        self.action = action
+        self.id = id
+        self.hotkey = hotkey
+        self.flags = flags
+        self.visible = visible
+        self.enabled = enabled
+
+    def __iter__(self):
+        yield self.text
+        yield self.action
+
+    def __len__(self):
+        return 2
+
+    def __getitem__(self, index):
+        return (self.text, self.action)[index]
+
+    def __repr__(self):
+        return (f"MenuOption({self.text!r}, {self.action!r}, id={self.id!r}, flags={self.flags}, "
+                f"hotkey={self.hotkey!r})")
+
+
+class JDDMenuSubmenu:
+    """
+    The action behind a submenu option: opens a child menu that is built on first entry and cached.
+
+    Writing an action that creates a JDDMenuBuilder, builds it and displays it rebuilds the whole
+    child menu every time the user enters it. A JDDMenuSubmenu keeps the built child instead and
+    only rebuilds it when its builder's definition has changed (tracked by JDDMenuBuilder.version)
+    or invalidate() is called.
+
+    Use JDDMenuBuilder.add_submenu() rather than creating one directly.
+
+    Attributes:
+        source (JDDMenuBuilder or callable): The child builder, or a callable returning it.
+        parent (JDDMenu or None): The menu the submenu option belongs to. The child menu shares
+                                  its output and input source and is built as the same kind of
+                                  menu (JDDMenu or AsyncJDDMenu). While the parent runs a batch,
+                                  the child continues that batch instead of displaying itself.
+    """
+
+    def __init__(self, source):
+        """
+        Initializes a new instance of JDDMenuSubmenu.
+        """
+        if not isinstance(source, JDDMenuBuilder) and not callable(source):
+            raise ValueError("A submenu must be a JDDMenuBuilder or a callable returning one")
+        self.source = source
+        self.parent = None
+        self._builder = source if isinstance(source, JDDMenuBuilder) else None
+        self._menu = None
+        self._built_version = None
+
+    def attach(self, parent):
+        """
+        Sets the menu this submenu belongs to. Called by JDDMenuBuilder when the parent is built.
+        """
+        if self.parent is not None and type(self.parent) is not type(parent):
+            self._menu = None
+        self.parent = parent
+
+    def invalidate(self):
+        """
+        Discards the cached child menu (and, for a callable source, its builder) so that the next
+        entry builds it again.
+        """
+        self._menu = None
+        if not isinstance(self.source, JDDMenuBuilder):
+            self._builder = None
+
+    @property
+    def menu(self):
+        """
+        JDDMenu: The child menu, built now if it hasn't been built yet or its definition changed.
+        """
+        if self._builder is None:
+            self._builder = self.source()
+            if not isinstance(self._builder, JDDMenuBuilder):
+                raise ValueError("The submenu callable must return a JDDMenuBuilder")
+        if self._menu is None or self._built_version != self._builder.version:
+            menu_class = type(self.parent) if self.parent is not None else JDDMenu
+            self._menu = self._builder._build(menu_class)
+            self._built_version = self._builder.version
+        # Applied on every entry, since the parent may have been rebuilt with other settings
+        if self.parent is not None:
+            if self._builder.output is None:
+                self._menu.output = self.parent.output
+            if self._builder.input_source is None:
+                self._menu.input_source = self.parent.input_source
+            if self._builder.metrics is None:
+                self._menu.metrics = self.parent.metrics
+            if self._builder.profiler is None:
+                self._menu.profiler = self.parent.profiler
+        return self._menu
+
+    def __call__(self, context):
+        if self.parent is not None and self.parent._batch is not None:
+            return self.menu._batch_loop(context, *self.parent._batch)
+        return self.menu.display_menu(context)
+
+
+class JDDMenuLazyAction:
+    """
+    An action given as a 'module:function' reference, imported the first time it is run.
+
+    Launchers with many options would otherwise import every heavy module (data libraries, SDK
+    clients) before the first menu frame appears. The reference is checked for the right shape
+    when the option is added, but the module is only imported on first selection, and the
+    resolved callable is kept for later selections.
+
+    Use JDDMenuBuilder.add_option() with a string action rather than creating one directly.
+
+    Attributes:
+        reference (str): The 'module:function' reference.
+        resolved (bool): True once the callable has been imported.
+    """
+
+    REFERENCE = re.compile(r"[\w.]+:[\w.]+")
+
+    def __init__(self, reference):
+        """
+        Initializes a new instance of JDDMenuLazyAction.
+        """
+        if not self.REFERENCE.fullmatch(reference):
+            raise ValueError(f"Action references must look like 'module:function', got {reference!r}")
+        self.reference = reference
+        self._target = None
+
+    @property
+    def resolved(self):
+        return self._target is not None
+
+    def resolve(self):
+        """
+        Imports and returns the referenced callable (only the first time).
+
+        Raises:
+        ValueError: If the reference cannot be imported or is not callable.
+        """
+        if self._target is None:
+            target = JDDMenuLoader.resolve(self.reference)
+            if not callable(target):
+                raise ValueError(f"Action {self.reference!r} is not callable")
+            self._target = target
+        return self._target
+
+    def __call__(self, context):
+        return self.resolve()(context)
+
+    def __reduce__(self):
+        # Worker processes resolve the reference themselves
+        return (JDDMenuLazyAction, (self.reference,))
+
+    def __repr__(self):
+        return f"JDDMenuLazyAction({self.reference!r})"
+
+
+class MenuContext(dict):
+    """
+    A dict-compatible context that keeps track of what changed.
+
+    Existing actions keep using the context as a plain dictionary. On top of that, every change
+    (setting a key to a different value, deleting a key, update(), clear(), ...) increments a
+    monotonic version counter, records the version at which each key last changed and marks the
+    key as dirty. Caches, dynamic labels and visibility rules can then ask what changed since they
+    last looked and recompute only that.
+
+    Only assignments to the context itself are seen: mutating an object stored in it (appending to
+    a list, for example) does not change the version. Call touch(key) after such changes.
+
+    Attributes:
+        version (int): Incremented on every change.
+        dirty (set): Keys changed (or deleted) since the last mark_clean().
+
+    Usage example:
+        context = MenuContext(user="bob")
+        seen = context.version
+        context["user"] = "alice"
+        context.changed_since(seen)   # {'user'}
+    """
+
+    def __init__(self, *args, **kwargs):
+        """
+        Initializes a new instance of MenuContext, accepting the same arguments as dict().
+        """
+        super().__init__()
+        self.version = 0
+        self.dirty = set()
+        self._changed_at = {}
+        self.update(*args, **kwargs)
+
+    def _changed(self, key):
+        self.version += 1
+        self._changed_at[key] = self.version
+        self.dirty.add(key)
+
+    def touch(self, key):
+        """
+        Records a change to a key whose value was modified in place.
+        """
+        self._changed(key)
+
+    def changed_since(self, version):
+        """
+        Returns the keys changed (or deleted) after a given version.
+
+        Parameters:
+        version (int): A version previously read from the context.
+
+        Returns:
+        set: The keys changed since then.
+        """
+        if version >= self.version:
+            return set()
+        return {key for key, changed_at in self._changed_at.items() if changed_at > version}
+
+    def key_version(self, key):
+        """
+        Returns the version at which a key last changed, or 0 if it never has.
+        """
+        return self._changed_at.get(key, 0)
+
+    def mark_clean(self):
+        """
+        Empties the dirty set (the version is unaffected).
+        """
+        self.dirty.clear()
+
+    def __setitem__(self, key, value):
+        if key in self and self[key] is value:
+            return
+        super().__setitem__(key, value)
+        self._changed(key)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._changed(key)
+
+    def pop(self, key, *default):
+        if key in self:
+            self._changed(key)
+        return super().pop(key, *default)
+
+    def popitem(self):
+        key, value = super().popitem()
+        self._changed(key)
+        return key, value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def clear(self):
+        for key in list(self):
+            del self[key]
+
+    def copy(self):
+        return MenuContext(self)
+
+    def __reduce__(self):
+        # Rebuild from the items so that unpickled contexts (e.g. in worker processes) track changes afresh
+        return (MenuContext, (dict(self),))
+
+    def __repr__(self):
+        return f"MenuContext({dict.__repr__(self)})"
+
+
+class JDDMenuMemoizedCondition:
+    """
+    A condition whose result is cached in a bounded LRU cache.
+
+    The cache key is the values of the context keys the condition declares, the value returned by
+    a version function, or (when neither is given) the version of a MenuContext, so a cached result
+    is reused only while the inputs the condition depends on are unchanged. When the cache holds maxsize results the least recently
+    used one is evicted.
+
+    Contexts whose declared values are unhashable (lists, dicts) are evaluated without caching, and
+    so are plain dict contexts when neither keys nor a version function is given, since they can't
+    report changes.
+
+    Attributes:
+        condition (callable): The wrapped condition.
+        keys (tuple of str or None): The context keys the condition reads.
+        version (callable or None): Returns the context's version when keys is not given. Defaults
+                                    to MenuContext.version.
+        maxsize (int): The maximum number of cached results.
+
+    Usage example:
+        is_admin = JDDMenuMemoizedCondition(lambda ctx: ldap_is_admin(ctx['user']), keys=['user'])
+        is_admin(context)
+        is_admin.cache_info()   # {'hits': ..., 'misses': ..., 'evictions': ..., 'size': ..., 'maxsize': 128}
+    """
+
+    def __init__(self, condition, keys=None, version=None, maxsize=128):
+        """
+        Initializes a new instance of JDDMenuMemoizedCondition.
+        """
+        if not callable(condition):
+            raise ValueError("Provided condition must be callable")
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+
+        self.condition = condition
+        self.keys = tuple(keys) if keys is not None else None
+        self.version = version
+        self.maxsize = maxsize
+        self._cache = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def cache_key(self, context):
+        """
+        Returns the cache key for a context.
+        """
+        if self.keys is not None:
+            return tuple(context.get(key) for key in self.keys) if context is not None else None
+        if self.version is not None:
+            return self.version(context)
+        if not isinstance(context, MenuContext):
+            raise ValueError("Memoized conditions without keys or a version function need a MenuContext")
+        return id(context), context.version
+
+    def __call__(self, context):
+        if self.keys is None and self.version is None and not isinstance(context, MenuContext):
+            with self._lock:
+                self._misses += 1
+            return self.condition(context)
+        key = self.cache_key(context)
+        try:
+            with self._lock:
+                result = self._cache[key]
+                self._cache.move_to_end(key)
+                self._hits += 1
+                return result
+        except KeyError:
+            pass
+        except TypeError:
+            # Unhashable key, nothing can be cached for this context
+            with self._lock:
+                self._misses += 1
+            return self.condition(context)
+
+        result = self.condition(context)
+        with self._lock:
+            self._misses += 1
+            self._cache[key] = result
+            if len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+                self._evictions += 1
+        return result
+
+    def cache_info(self):
+        """
+        Returns the cache statistics.
+
+        Returns:
+        dict: 'hits', 'misses', 'evictions', 'size' and 'maxsize'.
+        """
+        with self._lock:
+            return {'hits': self._hits, 'misses': self._misses, 'evictions': self._evictions,
+                    'size': len(self._cache), 'maxsize': self.maxsize}
+
+    def cache_clear(self):
+        """
+        Discards every cached result and resets the statistics.
+        """
+        with self._lock:
+            self._cache.clear()
+            self._hits = self._misses = self._evictions = 0
+
+
+class JDDMenuRuleTable:
+    """
+    A decision table that picks an action from the context, replacing nested dynamic actions.
+
+    Conditions are declared once as named predicates, and each rule lists the predicate values it
+    requires (True or False, predicates it doesn't mention don't matter). The first rule whose
+    requirements hold fires; when none does, the default action runs.
+
+    The rules are compiled into a decision tree that tests each predicate at most once, and only
+    the predicates needed to tell the remaining rules apart, so the cost of a decision depends on
+    the number of predicates rather than on how deeply the logic would have been nested. The
+    decision is then cached until the context changes (see JDDMenuMemoizedCondition for the cache
+    keys; without keys or a version function, MenuContext versions are used and other contexts
+    are decided every time).
+
+    Attributes:
+        predicates (dict): Predicate names mapped to callables taking the context.
+        rules (list of tuples): (name, requirements, action) in priority order.
+        default (callable or None): The action run when no rule fires.
+        last_rule (str or None): The name of the rule that fired last ('default' for the default
+                                 action, None when nothing ran).
+        fired (collections.Counter): How many times each rule fired.
+
+    Usage example:
+        dashboard = (JDDMenuRuleTable()
+                     .add_predicate('admin', lambda ctx: ctx['role'] == 'admin')
+                     .add_predicate('eu', lambda ctx: ctx['region'] in EU_REGIONS)
+                     .add_predicate('beta', lambda ctx: 'beta' in ctx['flags'])
+                     .add_rule('admin-eu', eu_admin_dashboard, admin=True, eu=True)
+                     .add_rule('admin', admin_dashboard, admin=True)
+                     .add_rule('beta', beta_dashboard, beta=True)
+                     .set_default(dashboard))
+        builder.add_option("Dashboard", dashboard)
+        dashboard.decide(context)   # 'admin-eu', 'admin', 'beta' or 'default'
+    """
+
+    DEFAULT = 'default'
+
+    def __init__(self, keys=None, version=None, maxsize=128):
+        """
+        Initializes a new instance of JDDMenuRuleTable.
+
+        Parameters:
+        keys (iterable of str, optional): The context keys the predicates read.
+        version (callable, optional): Returns a value that changes whenever a decision may change.
+        maxsize (int): The maximum number of cached decisions.
+        """
+        self.predicates = {}
+        self.rules = []
+        self.default = None
+        self.last_rule = None
+        self.fired = collections.Counter()
+        self._cached = JDDMenuMemoizedCondition(self._decide, keys, version, maxsize)
+        self._tree = None
+
+    def add_predicate(self, name, predicate):
+        """
+        Declares a named predicate rules can refer to.
+
+        Returns:
+        JDDMenuRuleTable: The table, to allow for method chaining.
+        """
+        if not callable(predicate):
+            raise ValueError("Provided predicate must be callable")
+        self.predicates[name] = predicate
+        return self._changed()
+
+    def add_rule(self, name, action, **requirements):
+        """
+        Adds a rule after the existing ones.
+
+        Parameters:
+        name (str): The name reported when the rule fires.
+        action (callable): The action to run.
+        requirements (bool): The value each named predicate must have.
+
+        Returns:
+        JDDMenuRuleTable: The table, to allow for method chaining.
+        """
+        if not callable(action):
+            raise ValueError("Provided action must be callable")
+        if name == self.DEFAULT or any(name == rule_name for rule_name, _, _ in self.rules):
+            raise ValueError(f"A rule named {name!r} already exists")
+        for predicate, value in requirements.items():
+            if predicate not in self.predicates:
+                raise ValueError(f"Rule {name!r} refers to an unknown predicate {predicate!r}")
+            if not isinstance(value, bool):
+                raise ValueError(f"Rule {name!r} must require True or False for {predicate!r}")
+        self.rules.append((name, requirements, action))
+        return self._changed()
+
+    def set_default(self, action):
+        """
+        Sets the action run when no rule fires.
+
+        Returns:
+        JDDMenuRuleTable: The table, to allow for method chaining.
+        """
+        if not callable(action):
+            raise ValueError("Provided action must be callable")
+        self.default = action
+        return self
+
+    def _changed(self):
+        self._tree = None
+        self._cached.cache_clear()
+        return self
+
+    def compile(self):
+        """
+        Builds the decision tree. Called automatically on the first decision after a change.
+
+        A node is either the index of the rule that fires (-1 for the default) or a tuple
+        (predicate name, node if true, node if false).
+
+        Returns:
+        JDDMenuRuleTable: The table, to allow for method chaining.
+        """
+        requirements = [rule_requirements for _, rule_requirements, _ in self.rules]
+        nodes = {}
+
+        def build(candidates, known):
+            key = (candidates, known)
+            if key not in nodes:
+                known_values = dict(known)
+                # Drop rules contradicted by what is known; the first remaining rule decides what to test
+                candidates = tuple(index for index in candidates
+                                   if all(known_values.get(predicate, value) == value
+                                          for predicate, value in requirements[index].items()))
+                if not candidates:
+                    nodes[key] = -1
+                else:
+                    unknown = [predicate for predicate in requirements[candidates[0]] if predicate not in known_values]
+                    if not unknown:
+                        nodes[key] = candidates[0]
+                    else:
+                        predicate = unknown[0]
+                        nodes[key] = (predicate,
+                                      build(candidates, tuple(sorted(known + ((predicate, True),)))),
+                                      build(candidates, tuple(sorted(known + ((predicate, False),)))))
+            return nodes[key]
+
+        self._tree = build(tuple(range(len(self.rules))), ())
+        return self
+
+    def _decide(self, context):
+        if self._tree is None:
+            self.compile()
+        node = self._tree
+        predicates = self.predicates
+        while type(node) is tuple:
+            predicate, if_true, if_false = node
+            node = if_true if predicates[predicate](context) else if_false
+        return node
+
+    def _rule_index(self, context):
+        cached = self._cached
+        if cached.keys is None and cached.version is None and not isinstance(context, MenuContext):
+            return self._decide(context)
+        return cached(context)
+
+    def decide(self, context):
+        """
+        Returns the name of the rule that fires for a context, without running it.
+
+        Returns:
+        str or None: The rule's name, 'default' when only the default applies, or None when no rule
+                     fires and there is no default.
+        """
+        index = self._rule_index(context)
+        if index >= 0:
+            return self.rules[index][0]
+        return self.DEFAULT if self.default is not None else None
+
+    def explain(self, context):
+        """
+        Walks the decision tree for a context, without caching, and reports how the decision was made.
+
+        Returns:
+        tuple: (rule name as returned by decide, dict of the predicates tested and their values).
+        """
+        if self._tree is None:
+            self.compile()
+        tested = {}
+        node = self._tree
+        while type(node) is tuple:
+            predicate, if_true, if_false = node
+            tested[predicate] = bool(self.predicates[predicate](context))
+            node = if_true if tested[predicate] else if_false
+        name = self.rules[node][0] if node >= 0 else (self.DEFAULT if self.default is not None else None)
+        return name, tested
+
+    def cache_info(self):
+        """
+        Returns the decision cache statistics (see JDDMenuMemoizedCondition.cache_info).
+        """
+        return self._cached.cache_info()
+
+    def __call__(self, context):
+        index = self._rule_index(context)
+        if index >= 0:
+            name, _, action = self.rules[index]
+        elif self.default is not None:
+            name, action = self.DEFAULT, self.default
+        else:
+            self.last_rule = None
+            return None
+        self.last_rule = name
+        self.fired[name] += 1
+        return action(context)
+
+
+class JDDMenuSafeAction:
+    """
+    An action wrapped with error handling, timeouts, retries with backoff and a circuit breaker.
+
+    Created by JDDMenuUtils.safe_action_generator(), which documents the parameters. The wrapper is a
+    normal menu action (it takes the context), so it can be passed straight to add_option().
+
+    Attributes:
+        action (callable): The wrapped action.
+        failures (int): Consecutive failed calls.
+        open_until (float or None): While the circuit breaker is open, the time.monotonic() at which it
+                                    allows a trial call.
+    """
+
+    def __init__(self, action, output=None, timeout=None, retries=0, backoff=0.5, max_backoff=30.0, jitter=0.1,
+                 breaker_threshold=None, breaker_reset=30.0):
+        """
+        Initializes a new instance of JDDMenuSafeAction.
+        """
+        # Error Prevention
+        if not callable(action):
+            raise ValueError("Provided actions must be callable")
+        if retries < 0 or backoff < 0 or max_backoff < 0 or not 0 <= jitter <= 1:
+            raise ValueError("retries, backoff and max_backoff cannot be negative and jitter must be between 0 and 1")
+        if (timeout is not None and timeout <= 0) or (breaker_threshold is not None and breaker_threshold < 1):
+            raise ValueError("timeout must be positive and breaker_threshold at least 1")
+
+        self.action = action
+        self.output = output
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.breaker_threshold = breaker_threshold
+        self.breaker_reset = breaker_reset
+        self.failures = 0
+        self.open_until = None
+        self._lock = threading.Lock()
+
+    def __call__(self, context):
+        with self._lock:
+            if self.open_until is not None and time.monotonic() < self.open_until:
+                remaining = self.open_until - time.monotonic()
+                self._report(f"Action disabled after {self.failures} failures, try again in {remaining:.1f}s.")
+                return None
+
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(self.retry_delay(attempt))
+            try:
+                result = self._run(context)
+            except Exception as e:
+                error = e
+                continue
+            with self._lock:
+                self.failures = 0
+                self.open_until = None
+            return result
+
+        with self._lock:
+            self.failures += 1
+            if self.breaker_threshold is not None and self.failures >= self.breaker_threshold:
+                self.open_until = time.monotonic() + self.breaker_reset
+        self._report(f"An error occurred: {error}")
+        return None
+
+    def retry_delay(self, attempt):
+        """
+        Returns the seconds to wait before a retry.
+
+        Parameters:
+        attempt (int): The retry about to be made, starting at 1.
+        """
+        delay = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _run(self, context):
+        if self.timeout is None:
+            return self.action(context)
+
+        outcome = {}
+
+        def target():
+            try:
+                outcome['result'] = self.action(context)
+            except BaseException as e:
+                outcome['error'] = e
+
+        worker = threading.Thread(target=target, name="JDDMenuSafeAction", daemon=True)
+        worker.start()
+        worker.join(self.timeout)
+        if worker.is_alive():
+            raise TimeoutError(f"the action did not finish within {self.timeout}s")
+        if 'error' in outcome:
+            raise outcome['error']
+        return outcome.get('result')
+
+    def _report(self, text):
+        if self.output is None:
+            print(text)
+        else:
+            self.output.print(text)
+
+
+class JDDMenuUtils:
+    """
+    A utility class for the JDDMenu system, providing various helper methods to enhance menu functionality.
+
+    JDDMenuUtils includes static methods that aid in creating and managing dynamic menu options and actions.
+    These utilities are designed to offer additional flexibility and robust error handling for menu items,
+    making it easier to create complex, context-aware, and error-resilient menu systems.
+
+    The class includes methods for generating actions based on certain conditions and safely executing actions 
     with error handling. It serves as a toolkit to augment the capabilities of the JDDMenu and 
     JDDMenuBuilder classes, ensuring that menus can be both versatile and reliable.
 
@@ -285,8 +2183,12 @@ class JDDMenuUtils:
     dynamic_action_generator(condition, action_if_true, action_if_false): Creates a dynamic action based
         on a provided condition, allowing different actions to be executed depending on the evaluation of
         the condition within the provided context.
-    safe_action_generator(context, action): Wraps a given action in error handling logic to manage and log
-        exceptions that occur during action execution, enhancing the stability of the menu system.
+    memoized_action_generator(condition, action_if_true, action_if_false, keys, version, maxsize): Like
+        dynamic_action_generator, but caches the condition's result until the context keys it depends
+        on (or the context version) change.
+    safe_action_generator(action, output, timeout, retries, ...): Wraps a given action in error handling logic
+        to manage and log exceptions that occur during action execution, with optional timeouts, retries
+        with backoff and a circuit breaker, enhancing the stability of the menu system.
 
     Note: This class is intended to be used in conjunction with JDDMenu and JDDMenuBuilder for building
     dynamic and robust menu systems in console applications.
@@ -311,7 +2213,66 @@ class JDDMenuUtils:
         return lambda context: action_if_true(context) if condition(context) else action_if_false(context)
 
     @staticmethod
-    def safe_action_generator(context, action_that_could_fail):
+    def memoized_action_generator(condition, action_if_true, action_if_false, keys=None, version=None, maxsize=128):
+        """
+        Generates a dynamic action whose condition is only evaluated again when its inputs change.
+
+        Conditions that check permissions against a directory service or a remote API are too slow
+        to run on every selection. The condition's result is cached in a bounded LRU cache keyed on
+        the values of the context keys the condition declares, or on a context version, so it is
+        recomputed automatically when those change.
+
+        Parameters:
+        condition (callable): A function that takes context as an argument and returns a boolean.
+        action_if_true (callable): The action to execute if the condition evaluates to True.
+        action_if_false (callable): The action to execute if the condition evaluates to False.
+        keys (iterable of str, optional): The context keys the condition reads.
+        version (callable, optional): A function returning a value that changes whenever the
+                                      condition's result may change (used when keys is not given).
+                                      Without keys or version the context must be a MenuContext,
+                                      and its version is used.
+        maxsize (int): The maximum number of cached results.
+
+        Returns:
+        callable: The dynamic action. Its 'condition' attribute is the JDDMenuMemoizedCondition,
+                  whose cache_info() reports hits, misses and evictions.
+        """
+        if not isinstance(condition, JDDMenuMemoizedCondition):
+            condition = JDDMenuMemoizedCondition(condition, keys, version, maxsize)
+        action = JDDMenuUtils.dynamic_action_generator(condition, action_if_true, action_if_false)
+        action.condition = condition
+        return action
+
+    @staticmethod
+    def rule_table_action_generator(predicates, rules, default=None, keys=None, version=None, maxsize=128):
+        """
+        Generates an action that picks what to run from a decision table instead of nested dynamic actions.
+
+        Parameters:
+        predicates (dict): Predicate names mapped to functions that take context and return a boolean.
+        rules (iterable of tuples): (name, requirements, action) in priority order, where requirements
+                                    maps predicate names to the value they must have.
+        default (callable, optional): The action to execute when no rule applies.
+        keys (iterable of str, optional): The context keys the predicates read, used to cache decisions.
+        version (callable, optional): A function returning a value that changes whenever a decision
+                                      may change (used when keys is not given).
+        maxsize (int): The maximum number of cached decisions.
+
+        Returns:
+        JDDMenuRuleTable: The action. Its decide() and last_rule report which rule fires.
+        """
+        table = JDDMenuRuleTable(keys, version, maxsize)
+        for name, predicate in predicates.items():
+            table.add_predicate(name, predicate)
+        for name, requirements, action in rules:
+            table.add_rule(name, action, **requirements)
+        if default is not None:
+            table.set_default(default)
+        return table
+
+    @staticmethod
+    def safe_action_generator(action_that_could_fail, output=None, timeout=None, retries=0, backoff=0.5,
+                              max_backoff=30.0, jitter=0.1, breaker_threshold=None, breaker_reset=30.0):
         """
         Wraps a given action in a safety layer to handle exceptions during its execution.
 
@@ -321,26 +2282,1689 @@ class JDDMenuUtils:
         is displayed. This approach ensures that the application remains stable and responsive even in 
         the face of unexpected errors.
 
+        The wrapper can also bound how long a failing or hanging action holds up the menu:
+            - timeout: a call taking longer than this many seconds is abandoned and counts as a failure.
+              Python threads cannot be killed, so the abandoned call keeps running in a daemon thread.
+            - retries: failed calls are retried up to this many times, waiting backoff * 2 ** attempt
+              seconds (capped at max_backoff, randomised by +/- jitter) between attempts.
+            - breaker_threshold: after this many consecutive failed calls the circuit breaker opens and
+              the action fails fast, without running, for breaker_reset seconds. The next call after that
+              is a trial: success closes the breaker, failure opens it again.
+
         Parameters:
-        context (dict): discussed within the module level docstring
         action_that_could_fail (callable): A callable object (function or lambda) that performs an action 
                                            and may raise exceptions during its execution.
+        output (JDDMenuOutput, optional): Sink used to report errors. Defaults to printing to stdout.
+        timeout (float, optional): Seconds before a call is abandoned.
+        retries (int): How many times a failed call is retried.
+        backoff (float): Seconds to wait before the first retry.
+        max_backoff (float): The longest wait between retries.
+        jitter (float): Fraction by which each wait is randomly lengthened or shortened.
+        breaker_threshold (int, optional): Consecutive failures that open the circuit breaker.
+        breaker_reset (float): Seconds the breaker stays open.
 
         Returns:
-        function: A lambda function that, when called, executes the provided action within a protected block. 
-                  It captures and handles any exceptions, printing an error message and preventing application crashes.
+        JDDMenuSafeAction: A callable that takes the context and executes the provided action within a
+                           protected block. It captures and handles any exceptions, printing an error message
+                           and preventing application crashes, and returns the action's result (None on failure).
 
         Note: This utility is particularly useful for actions within a menu system where stability and 
         error feedback are crucial for a good user experience.
         """
-        # Error Prevention
-        if not callable(action_that_could_fail):
-            raise ValueError("Provided actions must be callable")
-        
+        # Earlier versions were called as safe_action_generator(context, action[, output]) and ran the action
+        # straight away; keep supporting that call order
+        if not callable(action_that_could_fail) and callable(output):
+            context, action, output = action_that_could_fail, output, timeout
+            return JDDMenuSafeAction(action, output)(context)
+
+        return JDDMenuSafeAction(action_that_could_fail, output, timeout, retries, backoff, max_backoff, jitter,
+                                 breaker_threshold, breaker_reset)
+
+    # Future utility methods can be added here...
+
+
+class JDDMenuOutput:
+    """
+    A buffered output sink for JDDMenu.
+
+    Menus write all of their text (frames, messages and prompts) through a JDDMenuOutput instead of
+    calling print directly. The sink collects writes in memory and passes them to the underlying
+    stream in batches, which keeps headless and remote deployments from paying a write per line and
+    lets tests capture a menu's output without patching sys.stdout.
+
+    Flush policies:
+        'always': Every write is passed straight to the stream (the old print behaviour).
+        'prompt': Writes are batched and flushed whenever the menu prompts for input, or when the
+                  buffer reaches batch_size characters. This is the default.
+        'manual': Writes are only flushed when the buffer reaches batch_size characters or flush()
+                  is called explicitly.
+
+    Attributes:
+        stream (file-like or None): Where the output ends up. None means whatever sys.stdout is at
+                                    flush time.
+        batch_size (int): The number of buffered characters that forces a flush.
+        flush_policy (str): One of 'always', 'prompt' or 'manual'.
+
+    Usage example:
+        captured = io.StringIO()
+        menu = JDDMenuBuilder().set_output(JDDMenuOutput(captured)).add_option("Option 1", action1).build()
+        ...
+        captured.getvalue()
+    """
+
+    FLUSH_POLICIES = ('always', 'prompt', 'manual')
+
+    def __init__(self, stream=None, batch_size=8192, flush_policy='prompt'):
+        """
+        Initializes a new instance of JDDMenuOutput.
+        """
+        if flush_policy not in self.FLUSH_POLICIES:
+            raise ValueError(f"flush_policy must be one of {', '.join(self.FLUSH_POLICIES)}")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+
+        self.stream = stream
+        self.batch_size = batch_size
+        self.flush_policy = flush_policy
+        self._buffer = []
+        self._buffered = 0
+
+    def write(self, text):
+        """
+        Queues text for output, flushing according to the flush policy.
+
+        Parameters:
+        text (str): The text to write.
+        """
+        self._buffer.append(text)
+        self._buffered += len(text)
+        if self.flush_policy == 'always' or self._buffered >= self.batch_size:
+            self.flush()
+
+    def print(self, *values, sep=' ', end='\n'):
+        """
+        Writes values the way the built-in print would.
+        """
+        self.write(sep.join(str(value) for value in values) + end)
+
+    def prompt(self, text):
+        """
+        Writes a prompt and makes sure it (and everything before it) reaches the stream before
+        input is read. Under the 'manual' policy the prompt is only queued.
+
+        Parameters:
+        text (str): The prompt text.
+        """
+        self.write(text)
+        if self.flush_policy != 'manual':
+            self.flush()
+
+    def frame(self, text):
+        """
+        Writes a complete menu frame, ending with its prompt. Behaves like prompt(); sinks that can
+        update the terminal in place (see JDDMenuTerminalOutput) override it.
+
+        Parameters:
+        text (str): The frame, as returned by JDDMenu.render_frame().
+        """
+        self.prompt(text)
+
+    def capture(self):
+        """
+        Returns a context manager the menu runs actions in. Sinks that need to see what actions print
+        (see JDDMenuTerminalOutput) redirect sys.stdout through themselves; this one does nothing.
+        """
+        return _NO_CAPTURE
+
+    def flush(self):
+        """
+        Passes all buffered text to the stream in a single write.
+        """
+        stream = self.stream if self.stream is not None else sys.stdout
+        if self._buffer:
+            stream.write(''.join(self._buffer))
+            self._buffer.clear()
+            self._buffered = 0
+        if hasattr(stream, 'flush'):
+            stream.flush()
+
+
+_NO_CAPTURE = contextlib.nullcontext()
+
+
+class _CapturedStream:
+    """
+    Stands in for sys.stdout while a JDDMenuTerminalOutput captures an action's output.
+
+    Writes go through the sink so their lines are counted; everything else (isatty, encoding, ...)
+    is the real stream's, so actions that inspect sys.stdout keep working. Handing out the file
+    descriptor means the action may write to it directly, so the next frame is drawn in full.
+    """
+
+    def __init__(self, sink):
+        self._sink = sink
+
+    def write(self, text):
+        self._sink.write(text)
+        return len(text)
+
+    def flush(self):
+        self._sink.flush()
+
+    def fileno(self):
+        self._sink.flush()
+        self._sink.invalidate()
+        return self._sink.stream.fileno()
+
+    def __getattr__(self, name):
+        return getattr(self._sink.stream, name)
+
+
+class JDDMenuTerminalOutput(JDDMenuOutput):
+    """
+    An output sink for ANSI terminals that redraws menus in place.
+
+    A plain sink writes the whole frame again every time the menu is shown, which over a slow SSH
+    link floods the terminal and pushes earlier output out of view. This sink remembers the last
+    frame it drew and, when the next frame has the same number of lines, moves the cursor back up
+    and rewrites only the lines that changed (a refreshed status label, the options of another page),
+    then writes the prompt where the cursor was. What was printed below the frame since (prompts,
+    selections, action output) stays on screen.
+
+    To know where the frame is, the sink counts every line written since: the menu's own messages,
+    a line for each answer typed at a prompt, and, while an action runs, whatever the action prints,
+    because sys.stdout is redirected through the sink. The whole frame is written again as usual when
+    the previous frame has scrolled off the screen, the number of lines changed, a line is wider than
+    the terminal, or the stream is not an ANSI terminal (pipes, files, TERM=dumb), so the sink can be
+    used unconditionally.
+
+    Actions started with background=True print through the menu's jobs view rather than directly.
+    An action that takes sys.stdout's file descriptor (for example to pass it to a subprocess) gets
+    the next frame drawn in full; other output written to the terminal behind the sink's back is not
+    counted, which can misplace the next in-place redraw, so call invalidate() after such output.
+
+    Attributes:
+        ansi (bool): Whether in-place redraws are used.
+
+    Usage example:
+        menu = JDDMenuBuilder().set_output(JDDMenuTerminalOutput()).add_option("Option 1", action1).build()
+        menu.display_menu()
+    """
+
+    def __init__(self, stream=None, batch_size=8192, flush_policy='prompt', ansi=None):
+        """
+        Initializes a new instance of JDDMenuTerminalOutput.
+
+        The stream defaults to sys.stdout at the time the sink is created, since sys.stdout is
+        redirected to the sink itself while actions run. ansi=None detects whether the stream is an
+        ANSI terminal.
+        """
+        super().__init__(sys.stdout if stream is None else stream, batch_size, flush_policy)
+        if ansi is None:
+            try:
+                ansi = self.stream.isatty() and os.environ.get('TERM', '') != 'dumb'
+            except (AttributeError, ValueError):
+                ansi = False
+        self.ansi = ansi
+        self._lines = None  # the lines of the last frame, above its prompt
+        self._rows = 0      # rows from the top of the last frame down to the cursor
+        self._capturing = False
+
+    def invalidate(self):
+        """
+        Forgets the last frame, so the next one is written in full.
+        """
+        self._lines = None
+
+    def write(self, text):
+        if self._lines is not None:
+            self._count(text)
+        super().write(text)
+        if self._capturing:
+            self.flush()  # action output shows up as it is printed
+
+    def _count(self, text):
+        columns = self._size().columns
+        self._rows += text.count('\n')
+        if len(text) >= columns and any(len(line) >= columns for line in text.split('\n')):
+            self._lines = None  # wrapped lines make the row count unreliable
+
+    def prompt(self, text):
+        super().prompt(text)
+        if self._lines is not None:
+            self._rows += 1  # the answer's Enter
+
+    def frame(self, text):
+        """
+        Writes a menu frame, updating the previous frame in place when possible.
+
+        Parameters:
+        text (str): The frame, as returned by JDDMenu.render_frame().
+        """
+        lines = text.split('\n')
+        prompt = lines.pop()
+        size = self._size()
+        previous = self._lines
+        self._lines = None
+        if (not self.ansi or previous is None or len(previous) != len(lines) or self._rows >= size.lines
+                or any(len(line) >= size.columns for line in lines)):
+            self.prompt(text)
+            prompt_row = len(lines)
+        elif previous == lines:
+            self.prompt(prompt)
+            prompt_row = self._rows
+        else:
+            parts = [f"\x1b[{self._rows}A"]
+            down = 0
+            for old, new in zip(previous, lines):
+                if old != new:
+                    if down:
+                        parts.append(f"\x1b[{down}B")
+                    parts.append(f"\r{new}\x1b[K")
+                    down = 0
+                down += 1
+            down = self._rows - len(lines) + down
+            parts.append(f"\x1b[{down}B" if down else "")
+            parts.append(f"\r{prompt}\x1b[K")
+            self.prompt(''.join(parts))
+            prompt_row = self._rows
+        self._lines = lines
+        self._rows = prompt_row + 1  # the answer's Enter
+
+    def capture(self):
+        """
+        Redirects sys.stdout through the sink while an action runs, so the lines it prints are counted.
+        """
+        if not self.ansi:
+            return _NO_CAPTURE
+        return self._capture()
+
+    @contextlib.contextmanager
+    def _capture(self):
+        self.flush()
+        self._capturing = True
+        try:
+            with contextlib.redirect_stdout(_CapturedStream(self)):
+                yield
+        finally:
+            self._capturing = False
+
+    def _size(self):
+        try:
+            return os.get_terminal_size(self.stream.fileno())
+        except (AttributeError, OSError, ValueError):
+            return shutil.get_terminal_size()
+
+
+class JDDMenuInput:
+    """
+    An input source for JDDMenu.
+
+    Menus read the user's selections through a JDDMenuInput instead of calling input() directly.
+    By default it reads from the console, but it can also read from any stream (such as a pipe or
+    an open file) or iterate over a prepared sequence of selections, which is how menus are driven
+    from cron jobs, pipelines and tests.
+
+    End of input is always reported by raising EOFError, whatever the source.
+
+    Attributes:
+        source (stream, iterable or None): Where selections come from. None means the console.
+        keypress (bool): Whether selections can complete on a single key (see JDDMenuKeypressInput).
+
+    Usage example:
+        # Pipe selections in from a file and run them without rendering
+        menu = JDDMenuBuilder().add_option("Option 1", action1).build()
+        menu.run_batch(context, JDDMenuInput.from_file("selections.txt"))
+
+        # Or supply them directly
+        menu.run_batch(context, ["1", "1", "0"])
+    """
+
+    keypress = False
+
+    def __init__(self, source=None):
+        """
+        Initializes a new instance of JDDMenuInput.
+        """
+        if isinstance(source, str):
+            raise ValueError("Use JDDMenuInput.from_file() to read selections from a path")
+
+        self.source = source
+        self._pending = None
+        if source is None:
+            self._read = self._read_console
+        elif hasattr(source, 'readline'):
+            self._read = self._read_stream
+        else:
+            iterator = iter(source)
+            self._read = lambda: self._read_iterator(iterator)
+
+    @classmethod
+    def from_file(cls, path):
+        """
+        Creates an input source that reads one selection per line from a file.
+
+        Parameters:
+        path (str): The path of the file to read.
+
+        Returns:
+        JDDMenuInput: The input source.
+        """
+        return cls(open(path, encoding='utf-8'))
+
+    @property
+    def interactive(self):
+        """
+        bool: True when selections are typed by a person at the console.
+        """
+        return self.source is None
+
+    def read_line(self):
+        """
+        Reads the next selection.
+
+        Returns:
+        str: The selection, without its trailing newline.
+
+        Raises:
+        EOFError: If there are no more selections.
+        """
+        return self._read()
+
+    async def read_line_async(self):
+        """
+        Reads the next selection without blocking the event loop.
+
+        The console and streams are read in a daemon thread, so a read that is cancelled doesn't
+        keep the interpreter from exiting. Its line is not lost either: the next read returns it.
+
+        Returns:
+        str: The selection, without its trailing newline.
+
+        Raises:
+        EOFError: If there are no more selections.
+        """
+        if self.source is not None and not hasattr(self.source, 'readline'):
+            return self._read()
+        future = self._pending
+        if future is None:
+            future = self._pending = concurrent.futures.Future()
+            future.set_running_or_notify_cancel()
+            threading.Thread(target=self._read_into, args=(future,), name="JDDMenuInput", daemon=True).start()
+        try:
+            return await asyncio.wrap_future(future)
+        finally:
+            if future.done():
+                self._pending = None
+
+    def _read_into(self, future):
+        try:
+            future.set_result(self.read_line())
+        except BaseException as e:
+            future.set_exception(e)
+
+    def expect(self, option_count=None, keys=(), commands=()):
+        """
+        Describes the next selection to input sources that read single keys. Line-based sources
+        ignore it.
+
+        Parameters:
+        option_count (int or None): The number of options, or None if it is not known yet.
+        keys (container of str): Lowercased option ids and hotkeys; those of one character complete
+                                 a selection when pressed.
+        commands (iterable of str): Other single keys that complete a selection.
+        """
+
+    @staticmethod
+    def _read_console():
+        # Looked up on every read, so patching builtins.input after the menu is built still works
+        return input()
+
+    def _read_stream(self):
+        line = self.source.readline()
+        if not line:
+            raise EOFError
+        return line.rstrip('\r\n')
+
+    @staticmethod
+    def _read_iterator(iterator):
+        try:
+            return str(next(iterator)).rstrip('\r\n')
+        except StopIteration:
+            raise EOFError from None
+
+
+class JDDMenuKeypressInput(JDDMenuInput):
+    """
+    Reads selections from the terminal one keypress at a time, without waiting for Enter.
+
+    In menus with fewer than 10 options a digit selects immediately. In larger menus digits are
+    collected until no longer option number starts with them, Enter is pressed, or no further digit
+    arrives within the timeout; so in a 25 option menu '3' selects at once while '1' waits briefly
+    for a second digit. Hotkeys (and ids of one character) select immediately, as do the page
+    commands of paginated menus and the answers to "Do you want to continue?". Anything else
+    (searches, longer ids, page jumps) is typed as a line and completed with Enter.
+
+    The terminal is put in cbreak mode only while a selection is being read, so actions and other
+    programs see a normal terminal. When the stream is not a terminal (pipes, files, cron jobs) or
+    termios is unavailable, selections are read a line at a time as usual.
+
+    Attributes:
+        source (file): The terminal to read from, sys.stdin by default.
+        echo (file): Where typed keys are echoed, sys.stdout by default.
+        timeout (float): Seconds to wait for the next digit of a multi-digit selection.
+
+    Usage example:
+        menu = JDDMenuBuilder().set_input(JDDMenuKeypressInput()).add_option("Option 1", action1).build()
+        menu.display_menu()
+    """
+
+    keypress = True
+
+    _ENTER = ('\r', '\n')
+    _ERASE = ('\x7f', '\x08')
+    _END_OF_INPUT = '\x04'
+    _ESCAPE = '\x1b'
+
+    def __init__(self, stream=None, timeout=0.5, echo=None):
+        """
+        Initializes a new instance of JDDMenuKeypressInput.
+        """
+        stream = sys.stdin if stream is None else stream
+        if timeout <= 0:
+            raise ValueError("timeout must be positive")
+        super().__init__(stream)
+        self.echo = echo
+        self.timeout = timeout
+        self._option_count = None
+        self._keys = ()
+        self._commands = ()
+
+    @property
+    def raw(self):
+        """
+        bool: True when selections are read a key at a time, False when falling back to lines.
+        """
+        if termios is None:
+            return False
+        try:
+            return os.isatty(self.source.fileno())
+        except (AttributeError, OSError, ValueError):
+            return False
+
+    @property
+    def interactive(self):
+        return self.raw
+
+    def expect(self, option_count=None, keys=(), commands=()):
+        self._option_count = option_count
+        self._keys = keys
+        self._commands = commands
+
+    def read_line(self):
+        """
+        Reads the next selection, a key at a time when reading from a terminal.
+
+        Returns:
+        str: The selection.
+
+        Raises:
+        EOFError: If there are no more selections (Ctrl-D at the start of a selection).
+        """
+        if not self.raw:
+            return super().read_line()
+
+        fd = self.source.fileno()
+        saved = termios.tcgetattr(fd)
+        try:
+            tty.setcbreak(fd, termios.TCSANOW)  # keep keys typed ahead
+            selection = self._read_selection(fd)
+        finally:
+            termios.tcsetattr(fd, termios.TCSADRAIN, saved)
+            # The next read describes its own selection
+            self.expect()
+        self._echo("\n")
+        return selection
+
+    def _read_selection(self, fd):
+        decoder = codecs.getincrementaldecoder(getattr(self.source, 'encoding', None) or 'utf-8')(errors='replace')
+        typed = ''
+        while True:
+            waiting_for_digit = typed.isdigit()
+            if waiting_for_digit and not select.select([fd], [], [], self.timeout)[0]:
+                return typed
+            key = decoder.decode(os.read(fd, 1))
+            if not key:
+                continue  # part of a multi-byte character
+            if key == self._END_OF_INPUT and not typed:
+                raise EOFError
+            if key in self._ENTER:
+                return typed
+            if key in self._ERASE:
+                if typed:
+                    typed = typed[:-1]
+                    self._echo("\b \b")
+                continue
+            if key == self._ESCAPE:
+                # Drop the rest of escape sequences sent by arrow and function keys
+                while select.select([fd], [], [], 0.01)[0]:
+                    os.read(fd, 32)
+                continue
+            if not key.isprintable():
+                continue
+
+            self._echo(key)
+            if not typed and (key.lower() in self._commands or key.lower() in self._keys):
+                return key
+            typed += key
+            if typed.isdigit() and self._number_complete(typed):
+                return typed
+
+    def _number_complete(self, digits):
+        # A selection is complete when no option number continues these digits
+        if self._option_count is None:
+            return False
+        return digits == '0' or int(digits) * 10 > self._option_count
+
+    def _echo(self, text):
+        echo = sys.stdout if self.echo is None else self.echo
+        echo.write(text)
+        echo.flush()
+
+
+class JDDMenuOptionProvider:
+    """
+    Supplies menu options lazily.
+
+    Menus built from database queries or directory listings don't need every option materialized
+    up front. A provider wraps either a callable that returns an iterable of (option_text, action)
+    pairs, or an iterator/generator yielding them, and is only evaluated when the menu needs the
+    options, and only as far as it needs them.
+
+    Callable providers can be cached for a fixed time (ttl), cached until the menu is rebuilt
+    (the default), or evaluated every time the menu is shown (cache=False). A plain iterator can
+    only be consumed once, so its options are always cached.
+
+    Attributes:
+        source (callable or iterable): Where the options come from.
+        ttl (float or None): Seconds before a callable source is evaluated again.
+        cache (bool): Whether a callable source's options are reused between frames.
+        exhausted (bool): True once every option from the current evaluation has been read.
+
+    Usage example:
+        def host_options():
+            return ((host, lambda ctx, host=host: connect(host)) for host in list_hosts())
+
+        builder.add_option_provider(host_options, ttl=30)
+    """
+
+    def __init__(self, source, ttl=None, cache=True):
+        """
+        Initializes a new instance of JDDMenuOptionProvider.
+        """
+        if not callable(source) and not hasattr(source, '__iter__'):
+            raise ValueError("An option provider must be a callable or an iterable")
+        if ttl is not None and ttl < 0:
+            raise ValueError("ttl cannot be negative")
+
+        self.source = source
+        self.ttl = ttl
+        self.cache = cache
+        self.exhausted = False
+        self._options = []
+        self._iterator = None
+        self._loaded_at = None
+
+    @property
+    def stale(self):
+        """
+        bool: True if the options should be evaluated again before the next frame.
+        """
+        if self._loaded_at is None:
+            return True
+        if not callable(self.source):
+            return False
+        if not self.cache:
+            return True
+        return self.ttl is not None and time.monotonic() - self._loaded_at >= self.ttl
+
+    def refresh_if_stale(self):
+        """
+        Starts a new evaluation of the source if the current one is stale.
+
+        Returns:
+        bool: True if the options were discarded and will be read again.
+        """
+        if not self.stale:
+            return False
+        source = self.source() if callable(self.source) else self.source
+        self._iterator = iter(source)
+        self._options = []
+        self._loaded_at = time.monotonic()
+        self.exhausted = False
+        return True
+
+    def options(self, upto=None):
+        """
+        Returns the options read so far, reading more from the source if needed.
+
+        Parameters:
+        upto (int, optional): How many options are needed. None reads the source to the end.
+
+        Returns:
+        list of tuples: The (option_text, action) pairs read so far.
+        """
+        if self._loaded_at is None:
+            self.refresh_if_stale()
+        if not self.exhausted and (upto is None or len(self._options) < upto):
+            wanted = None if upto is None else upto - len(self._options)
+            self._options.extend(itertools.islice(self._iterator, wanted))
+            if upto is None or len(self._options) < upto:
+                self.exhausted = True
+                self._iterator = None
+        return self._options
+
+
+class JDDMenuSearchIndex:
+    """
+    A search index over menu option texts for type-ahead selection in very large menus.
+
+    The index is built once and extended incrementally as options are added:
+        - a sorted list of whole option texts, searched with bisect, for options starting with the query;
+        - a word -> positions posting list plus a sorted vocabulary, for options with words starting
+          with each word of the query;
+        - a trigram -> positions posting list, for options containing the query anywhere.
+    Posting lists are kept in menu order, so a search walks them lazily and stops as soon as it has
+    enough matches instead of scanning the whole menu.
+
+    Matches are ranked:
+        1. Option text starts with the query (alphabetically).
+        2. Every word of the query starts a word of the option text (in menu order).
+        3. The option text contains the query (in menu order).
+
+    Attributes:
+        max_candidates (int): The most candidate options examined for each rank of a single search,
+                              which bounds the cost of queries that match almost nothing.
+
+    Usage example:
+        index = JDDMenuSearchIndex(["Restart web-01", "Restart web-02", "Open ticket 4411"])
+        index.search("rest web")   # [0, 1]
+    """
+
+    _WORD = re.compile(r"\w+")
+
+    # Above this many vocabulary words, merging their posting lists costs more than scanning the menu
+    _MAX_MERGED_WORDS = 2048
+
+    def __init__(self, texts=(), max_candidates=20000):
+        """
+        Initializes a new instance of JDDMenuSearchIndex.
+        """
+        self.max_candidates = max_candidates
+        self._texts = []
+        self._words = []
+        self._sorted_texts = []
+        self._vocabulary = []
+        self._postings = {}
+        self._trigrams = {}
+        self._sorted = False
+        self.extend(texts)
+
+    def __len__(self):
+        return len(self._texts)
+
+    def add(self, text):
+        """
+        Adds the text of the next option to the index.
+
+        Parameters:
+        text (str): The option text.
+        """
+        position = len(self._texts)
+        lowered = str(text).lower()
+        words = tuple(self._WORD.findall(lowered))
+        self._texts.append(lowered)
+        self._words.append(words)
+        # Once the index has been searched, keep it sorted; before that, sort everything on the first search
+        add_sorted = bisect.insort if self._sorted else list.append
+        add_sorted(self._sorted_texts, (lowered, position))
+        for word in set(words):
+            postings = self._postings.get(word)
+            if postings is None:
+                self._postings[word] = [position]
+                add_sorted(self._vocabulary, word)
+            else:
+                postings.append(position)
+        for trigram in {lowered[i:i + 3] for i in range(len(lowered) - 2)}:
+            postings = self._trigrams.get(trigram)
+            if postings is None:
+                self._trigrams[trigram] = [position]
+            else:
+                postings.append(position)
+
+    def extend(self, texts):
+        """
+        Adds the texts of several options to the index.
+        """
+        for text in texts:
+            self.add(text)
+
+    def search(self, query, limit=10):
+        """
+        Finds the options matching a query.
+
+        Parameters:
+        query (str): The text to look for (case-insensitive).
+        limit (int): The maximum number of matches to return.
+
+        Returns:
+        list of int: Positions of the matching options in the menu, best match first.
+        """
+        query = query.strip().lower()
+        if not query or limit < 1:
+            return []
+        if not self._sorted:
+            self._sorted_texts.sort()
+            self._vocabulary.sort()
+            self._sorted = True
+
+        results = []
+        seen = set()
+        for matches in (self._text_prefix_matches(query),
+                        self._word_prefix_matches(self._WORD.findall(query)),
+                        self._substring_matches(query)):
+            for position in itertools.islice(matches, self.max_candidates):
+                if position not in seen:
+                    seen.add(position)
+                    results.append(position)
+                    if len(results) >= limit:
+                        return results
+        return results
+
+    def _text_prefix_matches(self, query):
+        index = bisect.bisect_left(self._sorted_texts, (query,))
+        while index < len(self._sorted_texts) and self._sorted_texts[index][0].startswith(query):
+            yield self._sorted_texts[index][1]
+            index += 1
+
+    def _word_prefix_matches(self, query_words):
+        if not query_words:
+            return
+        ranges = []
+        for word in query_words:
+            low = bisect.bisect_left(self._vocabulary, word)
+            high = bisect.bisect_left(self._vocabulary, word + '\U0010ffff', low)
+            if low == high:
+                return
+            if high - low <= self._MAX_MERGED_WORDS:
+                matching = sum(len(self._postings[vocabulary_word]) for vocabulary_word in self._vocabulary[low:high])
+            else:
+                matching = len(self._texts)
+            ranges.append((matching, low, high, word))
+        ranges.sort()
+        _, low, high, _ = ranges[0]
+
+        # Drive the search from the most selective word and check the rest against each candidate
+        if high - low <= self._MAX_MERGED_WORDS:
+            candidates = heapq.merge(*(self._postings[word] for word in self._vocabulary[low:high]))
+            required = [word for _, _, _, word in ranges[1:]]
+        else:
+            candidates = range(len(self._texts))
+            required = query_words
+        for position in candidates:
+            words = self._words[position]
+            if all(any(text_word.startswith(word) for text_word in words) for word in required):
+                yield position
+
+    def _substring_matches(self, query):
+        if len(query) < 3:
+            return
+        postings = []
+        for i in range(len(query) - 2):
+            found = self._trigrams.get(query[i:i + 3])
+            if found is None:
+                return
+            postings.append(found)
+        for position in min(postings, key=len):
+            if query in self._texts[position]:
+                yield position
+
+
+class JDDMenuMetrics:
+    """
+    Collects latency and throughput metrics for menus.
+
+    Pass an instance to JDDMenu (metrics=...) or JDDMenuBuilder.set_metrics() and the menu records:
+        - per option: a latency histogram, the number of calls and the number of calls that raised;
+        - per menu: how long each frame took to render and write, and how long the menu waited for input.
+    Menus without a metrics collector skip all timing.
+
+    Metrics can be exported as a JSON snapshot or in the Prometheus text format, for example to a
+    file picked up by node_exporter's textfile collector.
+
+    Attributes:
+        buckets (tuple of float): Upper bounds, in seconds, of the histogram buckets.
+
+    Usage example:
+        metrics = JDDMenuMetrics()
+        menu = JDDMenuBuilder().set_metrics(metrics).add_option("Option 1", action1).build()
+        menu.display_menu()
+        metrics.write_prometheus("/var/lib/node_exporter/jddmenu.prom")
+    """
+
+    DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 60.0)
+
+    _HELP = {
+        'jddmenu_action_seconds': "Time spent running menu option actions.",
+        'jddmenu_action_errors_total': "Menu option actions that raised an exception.",
+        'jddmenu_render_seconds': "Time spent rendering and writing menu frames.",
+        'jddmenu_input_wait_seconds': "Time spent waiting for the user's input.",
+    }
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """
+        Initializes a new instance of JDDMenuMetrics.
+        """
+        self.buckets = tuple(sorted(buckets))
+        self._histograms = {}
+        self._errors = collections.Counter()
+        self._lock = threading.Lock()
+
+    def _observe(self, name, labels, seconds):
+        with self._lock:
+            histogram = self._histograms.get((name, labels))
+            if histogram is None:
+                histogram = self._histograms[(name, labels)] = [[0] * len(self.buckets), 0.0, 0]
+            index = bisect.bisect_left(self.buckets, seconds)
+            if index < len(self.buckets):
+                histogram[0][index] += 1
+            histogram[1] += seconds
+            histogram[2] += 1
+
+    def observe_action(self, menu, option, seconds, error=False):
+        """
+        Records one run of an option's action.
+
+        Parameters:
+        menu (str): The menu's title.
+        option (str): The option's text.
+        seconds (float): How long the action took.
+        error (bool): Whether the action raised an exception.
+        """
+        labels = (('menu', menu), ('option', option))
+        self._observe('jddmenu_action_seconds', labels, seconds)
+        if error:
+            with self._lock:
+                self._errors[labels] += 1
+
+    def observe_render(self, menu, seconds):
+        """
+        Records the time taken to render and write one frame.
+        """
+        self._observe('jddmenu_render_seconds', (('menu', menu),), seconds)
+
+    def observe_input(self, menu, seconds):
+        """
+        Records the time spent waiting for one line of input.
+        """
+        self._observe('jddmenu_input_wait_seconds', (('menu', menu),), seconds)
+
+    def snapshot(self):
+        """
+        Returns the current metrics as plain data.
+
+        Returns:
+        dict: 'actions' (a list with menu, option, calls, errors, total_seconds and cumulative
+              histogram buckets for each option), 'render' and 'input_wait' (a list per menu).
+        """
+        with self._lock:
+            histograms = {key: (list(counts), total, calls) for key, (counts, total, calls) in self._histograms.items()}
+            errors = dict(self._errors)
+
+        snapshot = {'actions': [], 'render': [], 'input_wait': []}
+        sections = {'jddmenu_action_seconds': 'actions', 'jddmenu_render_seconds': 'render',
+                    'jddmenu_input_wait_seconds': 'input_wait'}
+        for (name, labels), (counts, total, calls) in sorted(histograms.items()):
+            entry = dict(labels)
+            entry['calls'] = calls
+            if name == 'jddmenu_action_seconds':
+                entry['errors'] = errors.get(labels, 0)
+            entry['total_seconds'] = total
+            entry['buckets'] = {str(bound): cumulative for bound, cumulative in
+                                zip(self.buckets, itertools.accumulate(counts))}
+            snapshot[sections[name]].append(entry)
+        return snapshot
+
+    def to_json(self, indent=None):
+        """
+        Returns the snapshot() as a JSON string.
+        """
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def to_prometheus(self):
+        """
+        Returns the metrics in the Prometheus text exposition format.
+
+        Returns:
+        str: The exposition text.
+        """
+        with self._lock:
+            histograms = {key: (list(counts), total, calls) for key, (counts, total, calls) in self._histograms.items()}
+            errors = dict(self._errors)
+
+        lines = []
+        for name in ('jddmenu_action_seconds', 'jddmenu_render_seconds', 'jddmenu_input_wait_seconds'):
+            lines.append(f"# HELP {name} {self._HELP[name]}")
+            lines.append(f"# TYPE {name} histogram")
+            for (series, labels), (counts, total, calls) in sorted(histograms.items()):
+                if series != name:
+                    continue
+                label_text = self._labels(labels)
+                for bound, cumulative in zip(self.buckets, itertools.accumulate(counts)):
+                    lines.append(f'{name}_bucket{{{label_text},le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{{label_text},le="+Inf"}} {calls}')
+                lines.append(f"{name}_sum{{{label_text}}} {total}")
+                lines.append(f"{name}_count{{{label_text}}} {calls}")
+
+        name = 'jddmenu_action_errors_total'
+        lines.append(f"# HELP {name} {self._HELP[name]}")
+        lines.append(f"# TYPE {name} counter")
+        for (series, labels), _ in sorted(histograms.items()):
+            if series == 'jddmenu_action_seconds':
+                lines.append(f"{name}{{{self._labels(labels)}}} {errors.get(labels, 0)}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _labels(labels):
+        escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+                   for _, value in labels)
+        return ",".join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped))
+
+    def write_prometheus(self, path):
+        """
+        Writes the metrics in the Prometheus text format to a file, replacing it atomically so a
+        collector never reads a half-written file.
+
+        Parameters:
+        path (str): The file to write, usually ending in .prom.
+        """
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, 'w', encoding='utf-8') as exposition:
+            exposition.write(self.to_prometheus())
+        os.replace(temporary, path)
+
+
+class JDDMenuProfiler:
+    """
+    Profiles menu actions on demand with cProfile and/or tracemalloc.
+
+    Profiling is switched on globally (every option of every menu using the profiler) or per option,
+    by option text, and can be toggled while the menu is running. Each profiled run writes, into the
+    profiler's directory:
+        - <menu>-<option>-<run>.pstats: the raw cProfile data, for pstats, snakeviz and friends;
+        - <menu>-<option>-<run>.txt: the top functions ranked by cumulative time;
+        - <menu>-<option>-<run>-alloc.txt: the top allocation sites ranked by memory allocated during the run.
+
+    Only the thread running the action is profiled, so actions started with background=True show the
+    cost of submitting the job, not of the job itself. Options selected while another option is being
+    profiled (such as the options of a profiled submenu) are included in the outer report rather than
+    profiled separately.
+
+    Attributes:
+        directory (str): Where reports are written. Created on first use.
+        cpu (bool): Whether to run actions under cProfile.
+        memory (bool): Whether to trace allocations with tracemalloc.
+        top (int): How many entries the text reports list.
+        options (set or None): The option texts to profile, or None to profile every option.
+        reports (list of str): Paths of the reports written so far.
+
+    Usage example:
+        profiler = JDDMenuProfiler("profiles", memory=True, options={"Slow report"})
+        menu = JDDMenuBuilder().set_profiler(profiler).add_option("Slow report", slow_report).build()
+        menu.display_menu()
+    """
+
+    def __init__(self, directory="jddmenu_profiles", cpu=True, memory=False, top=20, options=None):
+        """
+        Initializes a new instance of JDDMenuProfiler.
+
+        Raises:
+        ValueError: If neither cpu nor memory profiling is enabled, or top is not positive.
+        """
+        if not (cpu or memory):
+            raise ValueError("Enable cpu and/or memory profiling")
+        if top < 1:
+            raise ValueError("top must be at least 1")
+        self.directory = directory
+        self.cpu = cpu
+        self.memory = memory
+        self.top = top
+        self.options = None if options is None else set(options)
+        self.reports = []
+        self._runs = itertools.count(1)
+        self._local = threading.local()
+
+    def enable(self, option_text=None):
+        """
+        Starts profiling an option, or every option when option_text is None.
+        """
+        if option_text is None:
+            self.options = None
+        elif self.options is not None:
+            self.options.add(option_text)
+
+    def disable(self, option_text=None):
+        """
+        Stops profiling an option, or every option when option_text is None.
+        """
+        if option_text is None:
+            self.options = set()
+        elif self.options is None:
+            raise ValueError("Profiling is global, disable it with disable() and enable options one by one")
+        else:
+            self.options.discard(option_text)
+
+    def wants(self, menu_title, option_text):
+        """
+        Returns whether the option should be profiled.
+        """
+        return self.options is None or option_text in self.options
+
+    @contextlib.contextmanager
+    def profile(self, menu_title, option_text):
+        """
+        Profiles the code run inside the with block and writes its reports.
+
+        Parameters:
+        menu_title (str): The menu's title, used in the report names.
+        option_text (str): The option's text, used in the report names.
+        """
+        # cProfile and tracemalloc can't be nested, and the outer run already covers this code
+        if getattr(self._local, 'active', False):
+            yield
+            return
+        self._local.active = True
+        profile = cProfile.Profile() if self.cpu else None
+        tracing = self.memory and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        before = tracemalloc.take_snapshot() if self.memory else None
+        if profile is not None:
+            profile.enable()
         try:
-            action_that_could_fail(context)
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+            after = tracemalloc.take_snapshot() if self.memory else None
+            if tracing:
+                tracemalloc.stop()
+            self._local.active = False
+            self._write(menu_title, option_text, profile, before, after)
+
+    def _write(self, menu_title, option_text, profile, before, after):
+        os.makedirs(self.directory, exist_ok=True)
+        name = re.sub(r'[^\w.-]+', '_', f"{menu_title}-{option_text}").strip('_')[:80]
+        base = os.path.join(self.directory, f"{name}-{os.getpid()}-{next(self._runs)}")
+
+        if profile is not None:
+            profile.dump_stats(f"{base}.pstats")
+            with open(f"{base}.txt", 'w', encoding='utf-8') as report:
+                pstats.Stats(profile, stream=report).sort_stats('cumulative').print_stats(self.top)
+            self.reports += [f"{base}.pstats", f"{base}.txt"]
+
+        if after is not None:
+            ignore = (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, contextlib.__file__))
+            differences = after.filter_traces(ignore).compare_to(before.filter_traces(ignore), 'lineno')
+            differences = [difference for difference in differences if difference.size_diff > 0][:self.top]
+            with open(f"{base}-alloc.txt", 'w', encoding='utf-8') as report:
+                report.write(f"Top {len(differences)} allocation sites for {menu_title!r} / {option_text!r}\n")
+                for rank, difference in enumerate(differences, 1):
+                    frame = difference.traceback[0]
+                    report.write(f"{rank:>4}. {frame.filename}:{frame.lineno}: "
+                                 f"+{difference.size_diff / 1024:.1f} KiB in {difference.count_diff:+d} blocks\n")
+            self.reports.append(f"{base}-alloc.txt")
+
+
+class JDDMenuJob:
+    """
+    The record of a single background job started from a menu.
+
+    Attributes:
+        job_id (int): Sequential number of the job, starting at 1.
+        name (str): The text of the menu option that started the job.
+        status (str): 'queued', 'running', 'done' or 'failed'.
+        submitted (float): When the job was submitted (time.monotonic()).
+        started (float or None): When a worker picked the job up.
+        finished (float or None): When the job completed.
+        result: The action's return value once the job is done.
+        error (BaseException or None): The exception raised by the action if the job failed.
+        process (bool): True if the job runs in a worker process.
+    """
+
+    def __init__(self, job_id, name, process=False):
+        self.job_id = job_id
+        self.name = name
+        self.process = process
+        self.status = 'queued'
+        self.submitted = time.monotonic()
+        self.started = None
+        self.finished = None
+        self.result = None
+        self.error = None
+        self.future = None
+
+    @property
+    def elapsed(self):
+        """
+        float: Seconds the job has been running (or ran for), 0.0 while it is still queued.
+        """
+        if self.started is None:
+            return 0.0
+        end = self.finished if self.finished is not None else time.monotonic()
+        return end - self.started
+
+
+class JDDMenuJobs:
+    """
+    Runs menu actions in the background on a bounded thread pool.
+
+    Long-running options (reports, exports, remote calls) would otherwise keep the operator waiting
+    until they finish. Options added with JDDMenuBuilder.add_option(..., background=True) are
+    submitted here instead: the menu returns straight away and the job's status, elapsed time and
+    result can be checked from the built-in jobs view.
+
+    CPU-bound actions gain nothing from threads because of the GIL, so options added with
+    process=True run in a ProcessPoolExecutor instead. They receive a snapshot of the picklable
+    entries of the context, and their result or exception is marshalled back into the job record.
+
+    At most max_workers thread jobs and max_processes process jobs run at once, and each pool lets
+    at most max_pending more wait for one of its workers. Submissions beyond that are rejected with
+    a message rather than queued without limit.
+
+    Note: on platforms that start worker processes by spawning (Windows, macOS) the script that
+    builds the menu must guard its entry point with `if __name__ == '__main__':`.
+
+    Attributes:
+        jobs (list of JDDMenuJob): Every job submitted, in submission order.
+        max_workers (int): The number of worker threads.
+        max_pending (int): The number of jobs allowed to wait for a worker, per pool.
+        max_processes (int): The number of worker processes.
+        output (JDDMenuOutput): Where status messages and the jobs view are written. Set by the
+                                menu when it is built.
+    """
+
+    def __init__(self, max_workers=4, max_pending=16, max_processes=None):
+        """
+        Initializes a new instance of JDDMenuJobs.
+        """
+        self.jobs = []
+        self.output = None
+        self._executor = None
+        self._process_executor = None
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self.set_limits(max_workers, max_pending, max_processes)
+
+    def set_limits(self, max_workers, max_pending, max_processes=None):
+        """
+        Sets the concurrency and queue depth limits. Only allowed before the first job is submitted.
+        """
+        if max_processes is None:
+            max_processes = os.cpu_count() or 1
+        if max_workers < 1 or max_processes < 1 or max_pending < 0:
+            raise ValueError("max_workers and max_processes must be at least 1 and max_pending cannot be negative")
+        if self._executor is not None or self._process_executor is not None:
+            raise ValueError("Job limits cannot be changed once jobs have been submitted")
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.max_processes = max_processes
+
+    @property
+    def active(self):
+        """
+        int: The number of jobs that are queued or running.
+        """
+        return sum(1 for job in self.jobs if job.status in ('queued', 'running'))
+
+    def _pool_active(self, process):
+        # Each pool is limited on its own, so a busy process pool doesn't make room for thread jobs
+        return sum(1 for job in self.jobs if job.process == process and job.status in ('queued', 'running'))
+
+    def submit(self, name, action, context, process=False):
+        """
+        Submits an action to the thread pool, or to the process pool if process is True.
+
+        Parameters:
+        name (str): The name shown in the jobs view.
+        action (callable): The action to run.
+        context (dict): discussed within the module level docstring
+        process (bool): Run the action in a worker process with a snapshot of the context.
+
+        Returns:
+        JDDMenuJob or None: The job record, or None if the queue is full.
+        """
+        with self._lock:
+            workers = self.max_processes if process else self.max_workers
+            if self._pool_active(process) >= workers + self.max_pending:
+                return None
+            job = JDDMenuJob(next(self._ids), name, process)
+            self.jobs.append(job)
+            if not process:
+                if self._executor is None:
+                    self._executor = concurrent.futures.ThreadPoolExecutor(self.max_workers,
+                                                                           thread_name_prefix="JDDMenuJob")
+                self._executor.submit(self._run, job, action, context)
+                return job
+            if self._process_executor is None:
+                self._process_executor = concurrent.futures.ProcessPoolExecutor(self.max_processes)
+
+        future = self._process_executor.submit(_run_process_job, action, self.snapshot_context(context))
+        job.future = future
+        future.add_done_callback(lambda done: self._process_done(job, done))
+        return job
 
+    @staticmethod
+    def snapshot_context(context):
+        """
+        Returns a copy of the context holding only the entries that can be sent to a worker process.
+
+        Parameters:
+        context (dict or None): discussed within the module level docstring
+
+        Returns:
+        dict or None: The picklable entries of the context.
+        """
+        if context is None:
+            return None
+        snapshot = {}
+        for key, value in dict(context).items():
+            try:
+                pickle.dumps(value)
+            except Exception:
+                continue
+            snapshot[key] = value
+        return snapshot
+
+    @staticmethod
+    def _process_done(job, future):
+        job.finished = time.monotonic()
+        try:
+            job.result, duration = future.result()
+            job.started = job.finished - duration
+            job.status = 'done'
+        except BaseException as e:
+            if job.started is None:
+                job.started = job.submitted
+            job.error = e
+            job.status = 'failed'
+
+    @staticmethod
+    def _refresh(job):
+        # Process jobs are only seen through their future, so note when a worker picks them up
+        if job.status == 'queued' and job.process and job.future.running():
+            job.started = time.monotonic()
+            job.status = 'running'
+
+    @staticmethod
+    def _run(job, action, context):
+        job.started = time.monotonic()
+        job.status = 'running'
+        try:
+            job.result = action(context)
+            job.status = 'done'
         except Exception as e:
-            print(f"An error occurred: {e}")
+            job.error = e
+            job.status = 'failed'
+        finally:
+            job.finished = time.monotonic()
+
+    def background_action(self, name, action, process=False):
+        """
+        Wraps an action so that selecting it submits it as a background job.
+
+        Parameters:
+        name (str): The name shown in the jobs view.
+        action (callable): The action to run in the background.
+        process (bool): Run the action in a worker process instead of a thread.
+
+        Returns:
+        callable: An action that takes the context, submits the job and returns immediately.
+        """
+        def submit_job(context):
+            job = self.submit(name, action, context, process)
+            if job is None:
+                self._print(f"Too many background jobs, '{name}' was not started. Please try again later.")
+            else:
+                self._print(f"Started background job #{job.job_id}: {name}")
+            return job
+        return submit_job
+
+    def view_jobs(self, context=None):
+        """
+        Menu action that lists every background job with its status, elapsed time and result.
+        """
+        if not self.jobs:
+            self._print("No background jobs have been started.")
+            return
+        self._print(f"{'#':>4}  {'Status':<8} {'Elapsed':>9}  Job")
+        for job in list(self.jobs):
+            self._refresh(job)
+            if job.status == 'done':
+                outcome = f" -> {job.result!r}" if job.result is not None else ""
+            elif job.status == 'failed':
+                outcome = f" -> error: {job.error}"
+            else:
+                outcome = ""
+            self._print(f"{job.job_id:>4}  {job.status:<8} {job.elapsed:>8.1f}s  {job.name}{outcome}")
+
+    def shutdown(self, wait=True):
+        """
+        Stops accepting jobs and releases the worker threads.
+
+        Parameters:
+        wait (bool): Wait for queued and running jobs to finish first.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+        if self._process_executor is not None:
+            self._process_executor.shutdown(wait=wait)
+            self._process_executor = None
+
+    def _print(self, text):
+        if self.output is None:
+            print(text)
+        else:
+            self.output.print(text)
+
+
+class JDDMenuLoader:
+    """
+    Builds JDDMenu trees from declarative JSON or TOML definition files.
+
+    A definition describes a menu and its options; actions are referenced as 'module:function'
+    (the function may be a dotted path such as 'module:Class.method') and submenus are nested
+    menu definitions:
+
+        {
+            "title": "Main Menu",
+            "exit_option_text": "Quit",
+            "page_size": 20,
+            "options": [
+                {"text": "Say hello", "action": "greetings:say_hello", "id": "hello", "hotkey": "h"},
+                {"text": "Build report", "action": "reports:build", "background": true},
+                {"text": "Settings", "submenu": {"title": "Settings", "options": [...]}}
+            ]
+        }
+
+    Menu keys: title, exit_option_text, prompt, page_size and options (required).
+    Option keys: text (required), exactly one of action or submenu, the flags background
+    and process, id and hotkey, and visible and enabled as 'module:function' references to
+    predicates (see JDDMenuBuilder.add_option).
+
+    Action modules are imported lazily, the first time their option is selected (see
+    JDDMenuLazyAction).
+
+    Parsing and validating a large tree on every startup is wasted work, so the validated tree is
+    cached in a compact binary form (marshal) under a __jddcache__ directory next to the
+    definition. The cache is used as long as the file's modification time is unchanged, or its
+    SHA-256 hash matches when only the modification time changed.
+
+    Usage example:
+        menu = JDDMenuLoader().load("menus/main.json")
+        menu.display_menu(context)
+    """
+
+    CACHE_DIRECTORY = '__jddcache__'
+    CACHE_FORMAT = 4
+
+    _MENU_KEYS = {'title': str, 'exit_option_text': str, 'prompt': str, 'page_size': int, 'options': list}
+    _OPTION_KEYS = {'text': str, 'action': str, 'submenu': dict, 'background': bool, 'process': bool,
+                    'id': str, 'hotkey': str, 'visible': str, 'enabled': str}
+
+    def __init__(self, use_cache=True):
+        """
+        Initializes a new instance of JDDMenuLoader.
+
+        Parameters:
+        use_cache (bool): Read and write the compiled cache. Set to False to always parse the file.
+        """
+        self.use_cache = use_cache
+
+    def load(self, path):
+        """
+        Loads a definition file and builds the menu it describes.
+
+        Parameters:
+        path (str): The path of a .json or .toml definition.
+
+        Returns:
+        JDDMenu: The root menu.
+        """
+        return self.load_builder(path).build()
+
+    def load_builder(self, path):
+        """
+        Loads a definition file and returns the configured builder for its root menu, so that more
+        options or settings can be added in code before building.
 
-    # Future utility methods can be added here...
\ No newline at end of file
+        Parameters:
+        path (str): The path of a .json or .toml definition.
+
+        Returns:
+        JDDMenuBuilder: The builder for the root menu.
+        """
+        return self.builder_from_tree(self.load_tree(path))
+
+    def load_tree(self, path):
+        """
+        Returns the validated, compiled tree for a definition file, from the cache when possible.
+
+        Parameters:
+        path (str): The path of a .json or .toml definition.
+
+        Returns:
+        tuple: The compiled menu tree (see compile_menu).
+        """
+        if not self.use_cache:
+            with open(path, 'rb') as definition:
+                return self.compile_menu(self.parse(path, definition.read()))
+
+        stat = os.stat(path)
+        cache_path = self.cache_path(path)
+        cached = self._read_cache(cache_path)
+        if cached is not None and cached[1] == stat.st_mtime_ns:
+            return cached[3]
+
+        with open(path, 'rb') as definition:
+            data = definition.read()
+        digest = hashlib.sha256(data).hexdigest()
+        if cached is not None and cached[2] == digest:
+            tree = cached[3]
+        else:
+            tree = self.compile_menu(self.parse(path, data))
+        self._write_cache(cache_path, (self.CACHE_FORMAT, stat.st_mtime_ns, digest, tree))
+        return tree
+
+    def cache_path(self, path):
+        """
+        Returns where the compiled cache for a definition file is stored.
+        """
+        directory, name = os.path.split(os.path.abspath(path))
+        return os.path.join(directory, self.CACHE_DIRECTORY, name + '.jddc')
+
+    def _read_cache(self, cache_path):
+        try:
+            with open(cache_path, 'rb') as cache:
+                cached = marshal.load(cache)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        if not isinstance(cached, tuple) or len(cached) != 4 or cached[0] != self.CACHE_FORMAT:
+            return None
+        return cached
+
+    def _write_cache(self, cache_path, cached):
+        # The cache is an optimisation only, so an unwritable location just means no cache
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            temporary = f"{cache_path}.{os.getpid()}.tmp"
+            with open(temporary, 'wb') as cache:
+                marshal.dump(cached, cache)
+            os.replace(temporary, cache_path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def parse(path, data):
+        """
+        Parses the raw contents of a definition file.
+
+        Parameters:
+        path (str): The file's path, whose extension selects JSON or TOML.
+        data (bytes): The file's contents.
+
+        Returns:
+        dict: The parsed definition.
+        """
+        if path.lower().endswith('.toml'):
+            if tomllib is None:
+                raise ValueError("TOML menu definitions require Python 3.11 or later")
+            return tomllib.loads(data.decode('utf-8'))
+        return json.loads(data)
+
+    @classmethod
+    def compile_menu(cls, definition, where="menu"):
+        """
+        Validates a parsed menu definition and compiles it into nested tuples.
+
+        A compiled menu is (title, exit_option_text, prompt, page_size, options) and a compiled
+        option is (text, action, submenu, background, process, id, hotkey, visible, enabled), where
+        action, visible and enabled are 'module:function' strings or None, submenu is a compiled
+        menu or None, and id and hotkey are strings or None.
+
+        Parameters:
+        definition (dict): The parsed menu definition.
+        where (str): Describes the position of the definition in error messages.
+
+        Returns:
+        tuple: The compiled menu.
+
+        Raises:
+        ValueError: If the definition is invalid.
+        """
+        cls._check_keys(definition, cls._MENU_KEYS, where)
+        if 'options' not in definition:
+            raise ValueError(f"{where}: 'options' is required")
+        page_size = definition.get('page_size')
+        if page_size is not None and page_size < 1:
+            raise ValueError(f"{where}: 'page_size' must be at least 1")
+
+        options = []
+        option_keys = {}
+        for number, option in enumerate(definition['options'], start=1):
+            option_where = f"{where} option {number}"
+            cls._check_keys(option, cls._OPTION_KEYS, option_where)
+            if 'text' not in option:
+                raise ValueError(f"{option_where}: 'text' is required")
+            if ('action' in option) == ('submenu' in option):
+                raise ValueError(f"{option_where}: exactly one of 'action' or 'submenu' is required")
+
+            for key in ('action', 'visible', 'enabled'):
+                reference = option.get(key)
+                if reference is not None and not JDDMenuLazyAction.REFERENCE.fullmatch(reference):
+                    raise ValueError(f"{option_where}: {key} must look like 'module:function', got {reference!r}")
+            cls._check_option_keys(option, number, option_keys, page_size, option_where)
+            action = option.get('action')
+            submenu = option.get('submenu')
+            if submenu is not None:
+                submenu = cls.compile_menu(submenu, f"{option_where} submenu")
+            options.append((option['text'], action, submenu, option.get('background', False),
+                            option.get('process', False), option.get('id'), option.get('hotkey'),
+                            option.get('visible'), option.get('enabled')))
+
+        return (definition.get('title', "Menu"), definition.get('exit_option_text', "Exit"),
+                definition.get('prompt', "Select an option: "), page_size, tuple(options))
+
+    @staticmethod
+    def _check_option_keys(option, number, option_keys, page_size, where):
+        # The same rules as JDDMenuBuilder.add_option and _build, so that a tree which can't be
+        # built is never cached
+        hotkey = option.get('hotkey')
+        if hotkey is not None and len(hotkey) != 1:
+            raise ValueError(f"{where}: a hotkey must be a single character")
+        keys = [key for key in (option.get('id'), hotkey) if key is not None]
+        for key in keys:
+            if not JDDMenuBuilder._usable_key(key):
+                raise ValueError(f"{where}: {key!r} can't be used as an option id or hotkey")
+            if page_size is not None and key.lower() in ('n', 'p'):
+                raise ValueError(f"{where}: 'n' and 'p' are page commands in a paginated menu, "
+                                 f"they can't be option ids or hotkeys")
+            if key.lower() in option_keys:
+                raise ValueError(f"{where}: {key!r} is already used by option {option_keys[key.lower()]}")
+        if len({key.lower() for key in keys}) < len(keys):
+            raise ValueError(f"{where}: an option's id and hotkey must differ")
+        option_keys.update((key.lower(), number) for key in keys)
+
+    @staticmethod
+    def _check_keys(definition, allowed, where):
+        if not isinstance(definition, dict):
+            raise ValueError(f"{where}: expected a table/object")
+        for key, value in definition.items():
+            if key not in allowed:
+                raise ValueError(f"{where}: unknown key {key!r}")
+            if not isinstance(value, allowed[key]) or (allowed[key] is int and isinstance(value, bool)):
+                raise ValueError(f"{where}: {key!r} must be of type {allowed[key].__name__}")
+
+    @classmethod
+    def builder_from_tree(cls, tree):
+        """
+        Creates a builder from a compiled menu tree. Submenus are only turned into builders when
+        the user first enters them, and actions are only imported when first selected.
+
+        Parameters:
+        tree (tuple): A compiled menu (see compile_menu).
+
+        Returns:
+        JDDMenuBuilder: The configured builder.
+        """
+        title, exit_option_text, prompt, page_size, options = tree
+        builder = JDDMenuBuilder().set_title(title).set_exit_option_text(exit_option_text).set_prompt(prompt)
+        builder.set_page_size(page_size)
+        for text, action, submenu, background, process, id, hotkey, visible, enabled in options:
+            if submenu is not None:
+                builder.add_submenu(text, lambda submenu=submenu: cls.builder_from_tree(submenu), id, hotkey,
+                                    visible, enabled)
+            else:
+                builder.add_option(text, action, background, process, id, hotkey, visible, enabled)
+        return builder
+
+    @staticmethod
+    def resolve(reference):
+        """
+        Imports the callable named by a 'module:function' reference.
+
+        Parameters:
+        reference (str): The reference, for example 'reports:build' or 'tools.db:Client.connect'.
+
+        Returns:
+        callable: The referenced object.
+
+        Raises:
+        ValueError: If the module or attribute cannot be found.
+        """
+        module_name, _, attribute_path = reference.partition(':')
+        try:
+            target = importlib.import_module(module_name)
+            for attribute in attribute_path.split('.'):
+                target = getattr(target, attribute)
+        except (ImportError, AttributeError) as e:
+            raise ValueError(f"Cannot resolve action {reference!r}: {e}") from None
+        return target
+
+
+def _run_process_job(action, context):
+    # Runs inside a worker process; the duration lets the parent work out when the job started
+    start = time.perf_counter()
+    result = action(context)
+    return result, time.perf_counter() - start